@@ -1,9 +1,22 @@
-from machine import Pin, PWM
+from machine import Pin
+from heater import HeaterOutput
+from logger import log
 
 # --- Heater Setup ---
-heater_pin = Pin(9, Pin.OUT)
-heater_pwm = PWM(heater_pin, freq=1000)
-heater_pwm.duty(0)
+# Created on first use, or attach() the model's: every HeaterOutput runs its
+# own burst timer, and two of them must never drive the same SSR pin
+heater = None
+
+def attach(output):
+    """Drive an existing HeaterOutput (e.g. BrewingModel.heater)"""
+    global heater
+    heater = output
+
+def _heater():
+    global heater
+    if heater is None:
+        heater = HeaterOutput(9)
+    return heater
 
 # --- Pump Setup ---
 pump_pin = Pin(10, Pin.OUT)
@@ -12,21 +25,21 @@ pump_pin.value(0)
 # --- Heater Control ---
 def heater_on(pid_output):
     """
-    Accepts PID output (0–100) and sets PWM duty accordingly.
+    Accepts PID output (0–100) and sets the heater power accordingly.
     """
-    duty = int(pid_output / 100 * 1023)
-    heater_pwm.duty(duty)
-    print(f"🔥 Heater ON — PID: {pid_output:.1f} → Duty: {duty}/1023")
+    h = _heater()
+    h.set_power(pid_output)
+    log.debug("🔥 Heater ON — PID: %.1f → Duty: %d/65535", pid_output, h.level)
 
 def heater_off():
-    heater_pwm.duty(0)
-    print("🧊 Heater OFF")
+    _heater().off()
+    log.debug("🧊 Heater OFF")
 
 # --- Pump Control ---
 def pump_on():
     pump_pin.value(1)
-    print("💧 Pump ON")
+    log.info("💧 Pump ON")
 
 def pump_off():
     pump_pin.value(0)
-    print("🚫 Pump OFF")
\ No newline at end of file
+    log.info("🚫 Pump OFF")
\ No newline at end of file
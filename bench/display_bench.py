@@ -0,0 +1,149 @@
+# display_bench.py - Host-side benchmark of the display flush pipeline
+#
+# Replays the areas LVGL redraws for one update of the main screen through
+# display.Display and a FrameBufferPanel stand-in, for several draw buffer
+# configurations, and reports flushes and bytes per update and updates/s:
+#
+#     python bench/display_bench.py
+#
+# LVGL itself is not available on a PC, so rendering is approximated by
+# filling each band of the draw buffer; the figures cover the Python side of
+# the pipeline and the framebuffer copies, not LVGL's drawing.
+
+import time
+
+import run
+
+if __name__ == '__main__':
+    # Imported from run.py, the stubs and the tree under test (--root) are
+    # already on the path; only a standalone run sets them up
+    run.install_shims(run.DEFAULT_ROOT)
+
+import display  # noqa: E402
+import logger  # noqa: E402
+
+logger.log.console = False
+
+# Approximate areas (x1, y1, x2, y2) invalidated by BrewingGUI.update on the
+# main screen: temperature, setpoint, time to strike, stage, heater label and
+# bar, pump and heater buttons
+MAIN_SCREEN_AREAS = (
+    (90, 10, 389, 65),
+    (170, 40, 309, 57),
+    (170, 250, 309, 267),
+    (180, 280, 299, 297),
+    (180, 382, 299, 399),
+    (140, 400, 339, 419),
+    (370, 80, 469, 119),
+    (370, 130, 469, 169),
+)
+FULL_SCREEN = ((0, 0, display.WIDTH - 1, display.HEIGHT - 1),)
+
+# Rough PSRAM write bandwidth on the ESP32-S3, for the estimated copy time
+PSRAM_BYTES_PER_MS = 40000
+
+
+class Area:
+    def __init__(self, x1, y1, x2, y2):
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+
+
+class Pointer:
+    """Stands in for the color buffer pointer LVGL passes to flush_cb"""
+
+    def __init__(self, buf):
+        self.view = memoryview(buf)
+
+    def __dereference__(self, size):
+        return self.view[:size]
+
+
+class Renderer:
+    """
+    Minimal stand-in for LVGL's refresh: renders each area in bands that fit
+    a draw buffer, alternating buffers when there are two, and waits for a
+    buffer's flush to complete before reusing it.
+    """
+
+    def __init__(self, disp):
+        self.disp = disp
+        self.buffers = [b for b in (disp.buf1, disp.buf2) if b is not None]
+        self.pointers = [Pointer(b) for b in self.buffers]
+        self.lines = len(disp.buf1) // (display.WIDTH * display.BYTES_PER_PIXEL)
+        self.flushing = False
+        self.last = False
+        self.next = 0
+        disp.drv = self
+        self.pattern = memoryview(bytes(range(256)) * (len(disp.buf1) // 256 + 1))
+
+    # Driver methods called by Display
+    def flush_is_last(self):
+        return self.last
+
+    def flush_ready(self):
+        self.flushing = False
+
+    def refresh(self, areas):
+        for a, (x1, y1, x2, y2) in enumerate(areas):
+            width = x2 - x1 + 1
+            band = max(1, self.lines * display.WIDTH // width)
+            y = y1
+            while y <= y2:
+                end = min(y2, y + band - 1)
+                if len(self.buffers) == 1:
+                    # The only buffer must be copied out before rendering
+                    while self.flushing:
+                        self.disp._wait(self)
+                size = width * (end - y + 1) * display.BYTES_PER_PIXEL
+                self.pointers[self.next].view[:size] = self.pattern[:size]  # "render"
+                while self.flushing:
+                    self.disp._wait(self)
+                self.last = a == len(areas) - 1 and end == y2
+                self.flushing = True
+                self.disp._flush(self, Area(x1, y, x2, end), self.pointers[self.next])
+                self.next = (self.next + 1) % len(self.buffers)
+                y = end + 1
+        while self.flushing:
+            self.disp._wait(self)
+
+
+def make_update(buf_lines=48, double=True, areas=MAIN_SCREEN_AREAS, deferred=True):
+    """Return (display, callable redrawing one update)"""
+    panel = display.FrameBufferPanel(deferred=deferred)
+    disp = display.Display(panel, buf_lines=buf_lines, double=double, internal=False)
+    renderer = Renderer(disp)
+    return disp, lambda: renderer.refresh(areas)
+
+
+def measure(buf_lines, double, areas, min_time=0.5):
+    disp, update = make_update(buf_lines, double, areas)
+    update()
+    for key in disp.stats:
+        disp.stats[key] = 0
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        update()
+        count += 1
+    elapsed = time.perf_counter() - start
+    stats = disp.stats
+    return (count / elapsed, stats['flushes'] / count, stats['flush_bytes'] / count,
+            stats['frames'] / count)
+
+
+def main():
+    print(f"{'refresh':<8} {'lines':>5} {'buffers':>7} {'flushes':>8} "
+          f"{'KB/update':>10} {'copy ms':>8} {'host updates/s':>15}")
+    for name, areas in (('partial', MAIN_SCREEN_AREAS), ('full', FULL_SCREEN)):
+        for buf_lines in (24, 48, 96):
+            for double in (False, True):
+                rate, flushes, size, _ = measure(buf_lines, double, areas)
+                print(f"{name:<8} {buf_lines:>5} {2 if double else 1:>7} {flushes:>8.1f} "
+                      f"{size / 1024:>10.1f} {size / PSRAM_BYTES_PER_MS:>8.1f} {rate:>15.0f}")
+
+
+if __name__ == '__main__':
+    main()
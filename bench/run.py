@@ -0,0 +1,441 @@
+# run.py - Host-side benchmarks for each module's hot path
+#
+# Runs the controller code under CPython with the stand-in machine/lvgl/network
+# modules in bench/stubs, and measures per-call time, memory allocated per
+# call (tracemalloc) and module import time:
+#
+#     python bench/run.py -o before.json
+#     python bench/run.py -o after.json
+#     python bench/run.py --compare before.json after.json --threshold 0.2
+#
+# --root benchmarks another checkout with this suite, so two trees can be
+# compared without copying the benchmarks:
+#
+#     python bench/run.py --root ../old-checkout -o old.json
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+STUBS_DIR = os.path.join(BENCH_DIR, 'stubs')
+DEFAULT_ROOT = os.path.dirname(BENCH_DIR)
+
+MODULES = ('thermistor', 'simple_pid', 'estimator', 'health', 'heater',
+           'logger', 'smith', 'gains', 'history', 'model', 'controller', 'display',
+           'gui', 'touch', 'webserver', 'telemetry')
+
+TIME_SHIMS = '''
+import time
+if not hasattr(time, 'ticks_ms'):
+    time.ticks_ms = lambda: int(time.monotonic() * 1000) & 0x3FFFFFFF
+    time.ticks_us = lambda: int(time.monotonic() * 1000000) & 0x3FFFFFFF
+    time.ticks_diff = lambda a, b: ((a - b + 0x20000000) & 0x3FFFFFFF) - 0x20000000
+    time.ticks_add = lambda a, b: (a + b) & 0x3FFFFFFF
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1000000)
+'''
+
+
+def install_shims(root):
+    """Make the stand-in modules and MicroPython's time functions available"""
+    exec(TIME_SHIMS, {})
+    sys.path[:0] = [STUBS_DIR, root]
+    os.chdir(root)
+
+
+class FakeSocket:
+    """Socket stand-in for the web request handler"""
+
+    def __init__(self, request):
+        self.request = request
+        self.sent = 0
+
+    def recv(self, n):
+        data, self.request = self.request[:n], self.request[n:]
+        return data
+
+    def sendall(self, data):
+        self.sent += len(data)
+
+    send = sendall
+
+    def close(self):
+        pass
+
+
+# --- Cases ---------------------------------------------------------------
+#
+# Each case returns a zero-argument callable that performs one call of the
+# hot path; setup work happens outside the measured callable.
+
+def case_thermistor_read():
+    from thermistor import ThermistorReader
+    return ThermistorReader().read_temperature
+
+
+def case_pid_call():
+    from simple_pid import PID
+    pid = PID(2.0, 0.1, 0.05, setpoint=65.0)
+    pid.output_limits = (0, 100)
+    return lambda: pid(60.0, dt=1.0)
+
+
+def case_smith_call():
+    from simple_pid import PID
+    from smith import SmithPredictor
+    pid = PID(100.0, 0.05, 0.0, setpoint=65.0)
+    pid.output_limits = (0, 100)
+    smith = SmithPredictor(pid, 4.4, 20000.0, 69.0)
+    return lambda: smith(60.0, dt=1.0, rate=0.01)
+
+
+def _full_history():
+    from history import HistoryBuffer
+    h = HistoryBuffer()
+    for s in range(7200):
+        h.record(20.0 + s * 0.01, 66.0, 50.0, now=1000 + s)
+    return h
+
+
+def case_history_record():
+    h = _full_history()
+    now = [9000]
+
+    def call():
+        now[0] += 1
+        h.record(64.2, 66.0, 42.5, now=now[0])
+    return call
+
+
+def case_history_query():
+    h = _full_history()
+    return lambda: h.query(-7200, None, 200)
+
+
+def case_gain_schedule_apply():
+    from gains import GainSchedule
+    from simple_pid import PID
+    schedule = GainSchedule()
+    for temp, kp in ((50.0, 55.0), (66.0, 57.0), (76.0, 57.0), (95.0, 56.0)):
+        schedule.set_entry(temp, kp, 0.15, 5000.0)
+    pid = PID(setpoint=66.0)
+    return lambda: schedule.apply(pid, 66.0)
+
+
+def case_estimator_update():
+    from estimator import KettleEstimator
+    est = KettleEstimator()
+    est.update(60.0, 1.0)
+    return lambda: est.update(60.1, 1.0, 50.0)
+
+
+def case_health_update():
+    from health import SensorHealthMonitor
+    mon = SensorHealthMonitor()
+    readings = (60.0, 60.01)
+    index = [0]
+
+    def call():
+        index[0] ^= 1
+        mon.update(readings[index[0]], 1.0, 40.0)
+    return call
+
+
+def case_model_update_temperature():
+    import model
+    m = model.BrewingModel()
+    return m.update_temperature
+
+
+def case_model_get_heater_output():
+    import model
+    m = model.BrewingModel()
+    m.heater_enabled = True
+    m.heating_on = True
+    m.update_temperature()
+    return m.get_heater_output
+
+
+def case_heater_tick():
+    from heater import HeaterOutput
+    h = HeaterOutput(9)
+    h.set_power(37.5)
+    return h.tick
+
+
+def case_gui_update():
+    import gui
+    import model
+    g = gui.BrewingGUI(model.BrewingModel())
+    return lambda: g.update(temp=64.3, setpoint=65.0, heater=42.5, pump=False,
+                            stage="Heating", eta=125)
+
+
+def case_settings_dialog_cycle():
+    import gui
+    import model
+    g = gui.BrewingGUI(model.BrewingModel())
+
+    def call():
+        g.open_settings_dialog(None)
+        g.close_settings_dialog()
+    return call
+
+
+def case_display_update():
+    import display_bench
+    _, update = display_bench.make_update()
+    return update
+
+
+def case_gui_update_changing():
+    import gui
+    import model
+    g = gui.BrewingGUI(model.BrewingModel())
+    temps = (64.3, 64.4)
+    index = [0]
+
+    def call():
+        index[0] ^= 1
+        g.update(temp=temps[index[0]], setpoint=65.0, heater=42.5, pump=False,
+                 stage="Heating", eta=125 + index[0])
+    return call
+
+
+def case_touch_read():
+    import touch
+    driver = touch.GT911TouchDriver()
+    data = _TouchData()
+    return lambda: driver._read_touch(None, data)
+
+
+class _TouchData:
+    class point:
+        x = 0
+        y = 0
+    state = 0
+
+
+def case_logger_disabled():
+    from logger import Logger
+    log = Logger(level=30, console=False)
+    return lambda: log.debug("Heater PID: %.1f -> %d", 42.5, 27852)
+
+
+def case_telemetry_record():
+    import model
+    from telemetry import TelemetrySender
+    m = model.BrewingModel()
+    sender = TelemetrySender('127.0.0.1', 42199, batch=10)
+    return lambda: sender.record(m, now=0)
+
+
+def _web_case(request):
+    import model
+    import webserver
+    m = model.BrewingModel()
+    assets = webserver.load_assets()
+    req = request(assets) if callable(request) else request
+
+    def call():
+        webserver.handle_request(m, assets, FakeSocket(req))
+    return call
+
+
+def case_web_page():
+    return _web_case(b'GET / HTTP/1.1\r\nAccept-Encoding: gzip\r\n\r\n')
+
+
+def case_web_page_304():
+    return _web_case(lambda assets: b'GET / HTTP/1.1\r\nAccept-Encoding: gzip\r\n'
+                     b'If-None-Match: ' + assets['/'][3] + b'\r\n\r\n')
+
+
+def case_web_status():
+    return _web_case(b'GET /api/status HTTP/1.1\r\n\r\n')
+
+
+def case_web_history():
+    return _web_case(b'GET /api/history?from=-7200&points=200 HTTP/1.1\r\n\r\n')
+
+
+CASES = {name[5:]: fn for name, fn in sorted(globals().items())
+         if name.startswith('case_')}
+
+
+# --- Measurement ---------------------------------------------------------
+
+def time_per_call(fn, min_time=0.2, repeats=5):
+    """Median nanoseconds per call over several timing runs"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    runs = timer.repeat(repeat=repeats, number=number)
+    return statistics.median(runs) / number * 1e9
+
+
+def memory_per_call(fn, calls=200):
+    """
+    Peak bytes allocated during one call, and bytes retained per call over
+    many calls (a non-zero value means the hot path grows the heap).
+    """
+    fn()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_bytes = max(0, peak - before)
+
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(calls):
+            fn()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak_bytes, max(0, after - before) / calls
+
+
+def import_time(module, root, runs=3):
+    """Median seconds to import a module in a fresh interpreter"""
+    code = (TIME_SHIMS +
+            f'import sys, time as _t\nsys.path[:0] = [{STUBS_DIR!r}, {root!r}]\n'
+            f'_s = _t.perf_counter()\nimport {module}\n'
+            f'print(_t.perf_counter() - _s)\n')
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', code], cwd=root,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def run_benchmarks(root, selected=None, quick=False):
+    install_shims(root)
+    # Keep console output from the code under test out of the results
+    try:
+        import logger
+        logger.log.console = False
+    except ImportError:
+        pass
+
+    results = {
+        'meta': {
+            'root': root,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'cases': {},
+        'imports': {},
+    }
+
+    for name, case in CASES.items():
+        if selected and name not in selected:
+            continue
+        try:
+            fn = case()
+            fn()
+        except Exception as e:
+            # Older checkouts may lack a module or have a different signature
+            results['cases'][name] = {'skipped': str(e)}
+            print(f"{name:<28} skipped ({e})")
+            continue
+        ns = time_per_call(fn, min_time=0.05 if quick else 0.2)
+        peak, retained = memory_per_call(fn, calls=50 if quick else 200)
+        results['cases'][name] = {
+            'ns_per_call': round(ns, 1),
+            'peak_bytes': peak,
+            'retained_bytes_per_call': round(retained, 2),
+        }
+        print(f"{name:<28} {ns / 1000:9.2f} us  peak {peak:6d} B  "
+              f"retained {retained:7.2f} B/call")
+
+    for module in MODULES:
+        if selected and module not in selected:
+            continue
+        seconds = import_time(module, root, runs=1 if quick else 3)
+        results['imports'][module] = None if seconds is None else round(seconds * 1000, 3)
+        print(f"import {module:<21} " +
+              ("failed" if seconds is None else f"{seconds * 1000:9.2f} ms"))
+
+    return results
+
+
+# Absolute differences below these are treated as noise by compare()
+NOISE_FLOOR = {'peak_bytes': 16, 'retained_bytes_per_call': 1, 'import_ms': 2.0}
+
+
+def compare(old_path, new_path, threshold):
+    """Print changes between two result files; return the regression count"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    rows = []
+    for name, new_case in new['cases'].items():
+        old_case = old['cases'].get(name, {})
+        for metric in ('ns_per_call', 'peak_bytes', 'retained_bytes_per_call'):
+            rows.append((name, metric, old_case.get(metric), new_case.get(metric)))
+    for module, ms in new['imports'].items():
+        rows.append((module, 'import_ms', old['imports'].get(module), ms))
+
+    regressions = 0
+    for name, metric, before, after in rows:
+        if before is None or after is None:
+            continue
+        if before == 0:
+            change = 0.0 if after == 0 else float('inf')
+        else:
+            change = (after - before) / before
+        # Ignore noise on tiny absolute values
+        small = abs(after - before) < NOISE_FLOOR.get(metric, 0)
+        flag = ''
+        if change > threshold and not small:
+            flag = '  REGRESSION'
+            regressions += 1
+        elif change < -threshold and not small:
+            flag = '  improved'
+        print(f"{name:<28} {metric:<24} {before:>12} -> {after:>12} "
+              f"({change * 100:+7.1f}%){flag}")
+    print(f"{regressions} regression(s) beyond {threshold * 100:.0f}%")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hot-path benchmarks')
+    parser.add_argument('-o', '--output', help='write results to this JSON file')
+    parser.add_argument('--root', default=DEFAULT_ROOT,
+                        help='checkout to benchmark (default: this one)')
+    parser.add_argument('--case', action='append',
+                        help='only run these cases/modules (repeatable)')
+    parser.add_argument('--quick', action='store_true', help='shorter runs')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'))
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown counted as a regression')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    results = run_benchmarks(os.path.abspath(args.root), args.case, args.quick)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
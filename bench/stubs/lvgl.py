@@ -0,0 +1,32 @@
+# lvgl.py - CPython stand-in for the LVGL MicroPython binding (benchmarks only)
+#
+# Every widget, style, timer and constant is a _Stub: any attribute access or
+# call returns another stub, so GUI code runs with the Python-side cost of its
+# own logic and string formatting but no rendering.
+
+
+class _Stub:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return _Stub()
+
+    def __getattr__(self, name):
+        return _Stub()
+
+    def __bool__(self):
+        return False
+
+    def __int__(self):
+        return 0
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return id(self)
+
+
+def __getattr__(name):
+    return _Stub()
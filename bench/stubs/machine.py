@@ -0,0 +1,103 @@
+# machine.py - CPython stand-in for the MicroPython machine module (benchmarks only)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+
+    def __init__(self, id, mode=None, value=None):
+        self.id = id
+        self._value = value or 0
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = v
+
+
+class PWM:
+    def __init__(self, pin, freq=1000, duty=0):
+        self._freq = freq
+        self._duty = duty
+
+    def freq(self, f=None):
+        if f is None:
+            return self._freq
+        self._freq = f
+
+    def duty(self, d=None):
+        if d is None:
+            return self._duty
+        self._duty = d
+
+    def duty_u16(self, d=None):
+        if d is None:
+            return self._duty
+        self._duty = d
+
+    def deinit(self):
+        pass
+
+
+class ADC:
+    ATTN_11DB = 3
+    WIDTH_12BIT = 3
+
+    # Raw value returned by read(); benchmarks can change it
+    raw = 2048
+
+    def __init__(self, pin):
+        pass
+
+    def atten(self, a):
+        pass
+
+    def width(self, w):
+        pass
+
+    def read(self):
+        return ADC.raw
+
+
+class Timer:
+    PERIODIC = 1
+    ONE_SHOT = 0
+
+    def __init__(self, id=-1):
+        pass
+
+    def init(self, period=0, mode=PERIODIC, callback=None):
+        pass
+
+    def deinit(self):
+        pass
+
+
+class I2C:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def readfrom_mem(self, addr, reg, n):
+        return bytes(n)
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        for i in range(len(buf)):
+            buf[i] = 0
+
+    def writeto_mem(self, addr, reg, data):
+        pass
+
+    def scan(self):
+        return []
+
+
+class WDT:
+    def __init__(self, id=0, timeout=5000):
+        pass
+
+    def feed(self):
+        pass
+
+
+def reset():
+    raise SystemExit("machine.reset()")
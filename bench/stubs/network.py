@@ -0,0 +1,27 @@
+# network.py - CPython stand-in for the MicroPython network module (benchmarks only)
+
+STA_IF = 0
+AP_IF = 1
+
+
+class WLAN:
+    def __init__(self, interface=STA_IF):
+        pass
+
+    def active(self, state=None):
+        return True
+
+    def connect(self, ssid, password):
+        pass
+
+    def isconnected(self):
+        return True
+
+    def ifconfig(self):
+        return ('192.168.1.50', '255.255.255.0', '192.168.1.1', '192.168.1.1')
+
+    def status(self, param=None):
+        return -55
+
+    def config(self, param):
+        return b'\x00\x11\x22\x33\x44\x55'
@@ -0,0 +1,3 @@
+# ujson.py - CPython stand-in for MicroPython ujson (benchmarks only)
+
+from json import dump, dumps, load, loads  # noqa: F401
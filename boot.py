@@ -0,0 +1,10 @@
+# boot.py - Runs before main.py on every reset
+
+# Apply a staged over-the-air update, or roll back one whose main.py never
+# reached its first control tick.  Done here so a broken main.py can't stop it.
+try:
+    import ota
+    ota.boot()
+except Exception as e:
+    # A failed swap or rollback must not stop main.py from starting
+    print("OTA boot failed:", e)
@@ -0,0 +1,38 @@
+# build_web.py - Pre-compress the static web UI before copying it to flash
+#
+# Run on the host after editing anything in www/:
+#
+#     python build_web.py
+#
+# Writes www/<name>.gz next to each asset.  The web server prefers the .gz
+# file and sends it with Content-Encoding: gzip.
+
+import gzip
+import os
+import sys
+
+WWW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "www")
+EXTENSIONS = (".html", ".css", ".js")
+
+
+def build(www_dir=WWW_DIR):
+    total_raw = 0
+    total_gz = 0
+    for name in sorted(os.listdir(www_dir)):
+        if not name.endswith(EXTENSIONS):
+            continue
+        path = os.path.join(www_dir, name)
+        with open(path, "rb") as f:
+            raw = f.read()
+        # mtime=0 keeps the output (and so the ETag) stable across builds
+        packed = gzip.compress(raw, compresslevel=9, mtime=0)
+        with open(path + ".gz", "wb") as f:
+            f.write(packed)
+        total_raw += len(raw)
+        total_gz += len(packed)
+        print(f"{name:<12} {len(raw):6d} -> {len(packed):6d} bytes")
+    print(f"{'total':<12} {total_raw:6d} -> {total_gz:6d} bytes")
+
+
+if __name__ == "__main__":
+    build(sys.argv[1] if len(sys.argv) > 1 else WWW_DIR)
@@ -1,19 +1,54 @@
 from machine import Timer
+import time
+import ota
 
 class BrewingController:
-    def __init__(self, model, gui):
+    def __init__(self, model, gui, telemetry=None, memory=None):
         self.model = model
         self.gui = gui
+        self.telemetry = telemetry
+        self.memory = memory
+        self.fault_shown = None
+        self.ticks = 0
         self.timer = Timer(-1)
         self.timer.init(period=1000, mode=Timer.PERIODIC, callback=lambda t: self.loop())
 
     def loop(self):
+        start = time.ticks_us()
+        self.control_tick()
+        if self.memory:
+            # Tick duration, including any GC pause that hit it
+            self.memory.tick_done(time.ticks_diff(time.ticks_us(), start))
+
+    def control_tick(self):
+        self.ticks += 1
+        if self.ticks == 1:
+            # Reaching the first tick confirms a freshly applied OTA update
+            ota.mark_good()
+        ota.feed()
         self.model.update_temperature()
+        if self.model.fault != self.fault_shown:
+            self.fault_shown = self.model.fault
+            if self.model.fault:
+                self.gui.show_error_screen(self.model.fault)
+            else:
+                self.gui.show_main_screen()
+        # 0 while a fault keeps the heater latched off
         heater_output = self.model.get_heater_output()
+        # Keep recording through a fault, so the history has no gap and the
+        # fleet collector sees the fault flag rather than silence
+        self.model.history.record(self.model.temperature, self.model.setpoint,
+                                  heater_output)
+        if self.telemetry:
+            self.telemetry.record(self.model)
+        if self.model.fault:
+            # The error screen replaces the main one
+            return
         self.gui.update(
             temp=self.model.temperature,
             setpoint=self.model.setpoint,
             heater=heater_output,
             pump=self.model.pump_on,
-            stage=self.model.stage
+            stage=self.model.stage,
+            eta=self.model.time_to_setpoint()
         )
\ No newline at end of file
@@ -0,0 +1,191 @@
+# display.py - LVGL display driver for the ESP32-4848S040 480x480 RGB panel
+#
+# LVGL renders dirty areas into one or two draw buffers (partial refresh) and
+# hands each finished band to flush_cb.  The band is copied into the panel's
+# framebuffer and LVGL is told the buffer is free again from the panel's
+# completion callback, so a panel that copies by DMA can signal from its
+# interrupt while LVGL renders the next band into the other buffer.
+
+import time
+import lvgl as lv
+from logger import log
+
+WIDTH = 480
+HEIGHT = 480
+BYTES_PER_PIXEL = 2  # RGB565
+
+
+def _alloc(size, internal):
+    """
+    Draw buffer of `size` bytes.  Internal RAM is DMA capable and faster for
+    LVGL to render into; a bytearray lands on the MicroPython heap, which is
+    in PSRAM on this board.
+    """
+    if internal:
+        try:
+            import espidf
+            buf = espidf.heap_caps_malloc(
+                size, espidf.MALLOC_CAP.DMA | espidf.MALLOC_CAP.INTERNAL)
+            if buf:
+                return buf
+            log.warning("⚠️ No internal RAM for a %d byte draw buffer, using PSRAM", size)
+        except ImportError:
+            pass
+    return bytearray(size)
+
+
+class FrameBufferPanel:
+    """
+    Panel whose pixels live in a memory framebuffer: the RGB LCD peripheral
+    scans out a PSRAM framebuffer continuously, so drawing an area is a copy
+    into it.  Without a framebuffer (e.g. on a PC) one is allocated, which
+    makes this the host-side stand-in for benchmarks too.
+    """
+
+    def __init__(self, framebuffer=None, width=WIDTH, height=HEIGHT, deferred=False):
+        """
+        :param framebuffer: Writable buffer of width * height RGB565 pixels
+        :param deferred: Signal completion from poll() instead of straight
+                         away, like a DMA transfer finishing later
+        """
+        if framebuffer is None:
+            framebuffer = bytearray(width * height * BYTES_PER_PIXEL)
+        self.framebuffer = memoryview(framebuffer)
+        self.width = width
+        self.height = height
+        self.deferred = deferred
+        self._done = None
+
+    def draw(self, x1, y1, x2, y2, data, done):
+        """Copy an area of pixels into the framebuffer, then call done()"""
+        fb = self.framebuffer
+        row = (x2 - x1 + 1) * BYTES_PER_PIXEL
+        stride = self.width * BYTES_PER_PIXEL
+        offset = y1 * stride + x1 * BYTES_PER_PIXEL
+        if row == stride:
+            # Full-width band: one contiguous copy
+            size = (y2 - y1 + 1) * row
+            fb[offset:offset + size] = data[:size]
+        else:
+            src = 0
+            for _ in range(y2 - y1 + 1):
+                fb[offset:offset + row] = data[src:src + row]
+                offset += stride
+                src += row
+        if self.deferred:
+            self._done = done
+        else:
+            done()
+
+    def poll(self):
+        """Complete a deferred transfer"""
+        done = self._done
+        if done is not None:
+            self._done = None
+            done()
+
+
+class Display:
+    """
+    Registers the panel with LVGL using partial refresh and one or two draw
+    buffers of `buf_lines` full-width lines, and drives the LVGL task handler
+    at the pace LVGL asks for.
+    """
+
+    def __init__(self, panel, width=WIDTH, height=HEIGHT, buf_lines=48,
+                 double=True, internal=True):
+        """
+        :param panel: Object with draw(x1, y1, x2, y2, data, done) and poll()
+        :param buf_lines: Height of each draw buffer in lines
+        :param double: Allocate a second buffer so LVGL renders the next band
+                       while the previous one is being copied out
+        :param internal: Put the draw buffers in internal RAM rather than PSRAM
+        """
+        self.panel = panel
+        size = width * buf_lines * BYTES_PER_PIXEL
+        self.buf1 = _alloc(size, internal)
+        self.buf2 = _alloc(size, internal) if double else None
+
+        self.draw_buf = lv.disp_draw_buf_t()
+        self.draw_buf.init(self.buf1, self.buf2, width * buf_lines)
+        self.drv = lv.disp_drv_t()
+        self.drv.init()
+        self.drv.draw_buf = self.draw_buf
+        self.drv.flush_cb = self._flush
+        self.drv.wait_cb = self._wait
+        self.drv.hor_res = width
+        self.drv.ver_res = height
+        self.drv.full_refresh = 0
+        self.disp = self.drv.register()
+
+        # Bound once so a flush doesn't allocate a new method object
+        self._done_cb = self._flush_done
+        self._flush_start = 0
+        self.stats = {'frames': 0, 'flushes': 0, 'flush_bytes': 0, 'flush_us': 0,
+                      'handler_us': 0, 'handler_us_max': 0}
+
+    def _flush(self, drv, area, color_p):
+        x1 = area.x1
+        y1 = area.y1
+        x2 = area.x2
+        y2 = area.y2
+        size = (x2 - x1 + 1) * (y2 - y1 + 1) * BYTES_PER_PIXEL
+        stats = self.stats
+        stats['flushes'] += 1
+        stats['flush_bytes'] += size
+        if drv.flush_is_last():
+            stats['frames'] += 1
+        self._flush_start = time.ticks_us()
+        self.panel.draw(x1, y1, x2, y2, color_p.__dereference__(size), self._done_cb)
+
+    def _flush_done(self):
+        self.stats['flush_us'] += time.ticks_diff(time.ticks_us(), self._flush_start)
+        self.drv.flush_ready()
+
+    def _wait(self, drv):
+        # LVGL needs a buffer that is still being flushed
+        self.panel.poll()
+
+    def run(self, min_ms=2, max_ms=30, idle=None):
+        """
+        Run the LVGL loop forever.  The tick advances by the time that really
+        passed, and the loop sleeps until LVGL's next timer is due (clamped
+        to min_ms..max_ms), so it idles when nothing changes and keeps up
+        when animations or touch need more frequent refreshes.
+
+        :param idle: Called before each sleep (e.g. MemoryManager.idle)
+        """
+        stats = self.stats
+        last = time.ticks_ms()
+        while True:
+            now = time.ticks_ms()
+            elapsed = time.ticks_diff(now, last)
+            if elapsed > 0:
+                lv.tick_inc(elapsed)
+                last = now
+            start = time.ticks_us()
+            delay = lv.task_handler()
+            spent = time.ticks_diff(time.ticks_us(), start)
+            stats['handler_us'] = spent
+            if spent > stats['handler_us_max']:
+                stats['handler_us_max'] = spent
+            if not isinstance(delay, int) or delay > max_ms:
+                delay = max_ms
+            elif delay < min_ms:
+                delay = min_ms
+            if idle:
+                idle()
+            time.sleep_ms(delay)
+
+
+def open_panel():
+    """
+    The panel framebuffer from the firmware's RGB panel driver (rgb_panel
+    module), or a RAM framebuffer so the UI still runs without one.
+    """
+    try:
+        import rgb_panel
+        return FrameBufferPanel(rgb_panel.framebuffer())
+    except ImportError:
+        log.warning("⚠️ No RGB panel driver in this firmware, display is headless")
+        return FrameBufferPanel()
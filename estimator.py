@@ -0,0 +1,71 @@
+# estimator.py - Alpha-beta state estimator for kettle temperature and heating rate
+
+class KettleEstimator:
+    """
+    Two-state (temperature, rate of rise) alpha-beta estimator with a heater
+    power input.  Sits between ThermistorReader and PID so the controller sees
+    a smoothed temperature and a rate estimate without the lag of a heavy
+    low-pass filter.
+    """
+
+    def __init__(self, alpha=0.5, beta=0.1, heat_gain=0.0):
+        """
+        :param alpha: Temperature correction gain (0..1)
+        :param beta: Rate correction gain (0..1)
+        :param heat_gain: Expected change in rate of rise (°C/s) per % of
+                          heater power; 0 disables the power input
+        """
+        self.alpha = alpha
+        self.beta = beta
+        self.heat_gain = heat_gain
+
+        self.temperature = None
+        self.rate = 0.0
+        self._last_power = 0.0
+
+    def update(self, measurement, dt, power=0.0):
+        """
+        Fold a new reading into the estimate.
+
+        :param measurement: Raw temperature reading (°C)
+        :param dt: Time since the previous reading in seconds
+        :param power: Heater power applied over the last interval (0-100)
+        :return: Filtered temperature
+        """
+        if self.temperature is None or dt <= 0.0:
+            self.temperature = measurement
+            self._last_power = power
+            return measurement
+
+        # Predict: integrate the rate, and let a change in heater power
+        # shift the rate immediately instead of waiting for the residual.
+        predicted = self.temperature + self.rate * dt
+        rate = self.rate + self.heat_gain * (power - self._last_power)
+        self._last_power = power
+
+        # Correct
+        residual = measurement - predicted
+        self.temperature = predicted + self.alpha * residual
+        self.rate = rate + self.beta * residual / dt
+        return self.temperature
+
+    def time_to_setpoint(self, setpoint):
+        """
+        Predicted seconds until the setpoint is reached at the current rate.
+
+        :return: Seconds, 0 if already there, None if not approaching it
+        """
+        if self.temperature is None:
+            return None
+        error = setpoint - self.temperature
+        if -0.1 <= error <= 0.1:
+            return 0
+        if self.rate == 0.0 or (error > 0) != (self.rate > 0):
+            return None
+        return error / self.rate
+
+    def reset(self):
+        """Forget the current estimate"""
+        self.temperature = None
+        self.rate = 0.0
+        self._last_power = 0.0
@@ -0,0 +1,120 @@
+# gains.py - PID gain scheduling on the setpoint
+
+from array import array
+
+
+class GainSchedule:
+    """
+    PID gains that follow the operating point.  Entries (temperature ->
+    kp, ki, kd), typically from auto-tune runs at several setpoints, are
+    interpolated once into a table with one row per `resolution` °C, so a
+    control tick only costs an index calculation and a comparison; gains are
+    changed bumplessly, and only when the index moves.
+    """
+
+    def __init__(self, t_min=0.0, t_max=105.0, resolution=0.5):
+        """
+        :param t_min: Lowest scheduled temperature (°C)
+        :param t_max: Highest scheduled temperature (°C)
+        :param resolution: Table step (°C)
+        """
+        self.t_min = t_min
+        self.resolution = resolution
+        self.size = int((t_max - t_min) / resolution) + 1
+        self.kp = array('f', [0.0] * self.size)
+        self.ki = array('f', [0.0] * self.size)
+        self.kd = array('f', [0.0] * self.size)
+        self.entries = {}
+        self.active = False
+        self._index = -1
+
+    def set_entry(self, temp, kp, ki, kd):
+        """Add or replace the gains for one operating point"""
+        self.entries[float(temp)] = (kp, ki, kd)
+        self.rebuild()
+
+    def remove_entry(self, temp):
+        self.entries.pop(float(temp), None)
+        self.rebuild()
+
+    def rebuild(self):
+        """Interpolate the entries into the lookup table"""
+        points = sorted(self.entries.items())
+        self.active = bool(points)
+        self._index = -1
+        if not points:
+            return
+        j = 0
+        for i in range(self.size):
+            t = self.t_min + i * self.resolution
+            while j < len(points) - 1 and points[j + 1][0] <= t:
+                j += 1
+            t0, g0 = points[j]
+            if t <= t0 or j == len(points) - 1:
+                # Flat beyond the first and last entries
+                g = g0
+            else:
+                t1, g1 = points[j + 1]
+                f = (t - t0) / (t1 - t0)
+                g = (g0[0] + f * (g1[0] - g0[0]),
+                     g0[1] + f * (g1[1] - g0[1]),
+                     g0[2] + f * (g1[2] - g0[2]))
+            self.kp[i] = g[0]
+            self.ki[i] = g[1]
+            self.kd[i] = g[2]
+
+    def index(self, temp):
+        """Table row for a temperature"""
+        i = int((temp - self.t_min) / self.resolution + 0.5)
+        if i < 0:
+            return 0
+        if i >= self.size:
+            return self.size - 1
+        return i
+
+    def gains(self, temp):
+        i = self.index(temp)
+        return self.kp[i], self.ki[i], self.kd[i]
+
+    def apply(self, pid, temp):
+        """
+        Give the PID the gains for temp if they differ from the last ones.
+
+        :return: True when the gains were changed
+        """
+        i = self.index(temp)
+        if i == self._index:
+            return False
+        self._index = i
+        pid.set_tunings_bumpless(self.kp[i], self.ki[i], self.kd[i])
+        return True
+
+
+# Switching band (°C either side of the setpoint) for relay auto-tune
+RELAY_HYSTERESIS = 0.2
+# Highest setpoint a relay test can run at: the kettle must be able to rise
+# above setpoint + hysteresis, which it can't close to the boil
+RELAY_MAX_SETPOINT = 95.0
+
+
+def relay_tuning(switches, peaks, output=100.0):
+    """
+    Ziegler-Nichols gains from a relay test: the heater switched between
+    0 and `output` % around the setpoint, starting with a switch off once the
+    heat-up reached it.  The first half cycle starts from the heat-up
+    overshoot and is skipped.
+
+    :param switches: Switch times (s), at least five (two full cycles)
+    :param peaks: Extreme temperature between each pair of switches, so
+                  peaks[0] is the heat-up maximum and lows and highs alternate
+    :return: (kp, ki, kd)
+    """
+    cycles = (len(switches) - 3) / 2
+    period = (switches[-1] - switches[2]) / cycles
+    highs = peaks[2::2]
+    lows = peaks[1::2]
+    amplitude = (sum(highs) / len(highs) - sum(lows) / len(lows)) / 2
+    # Ultimate gain from the describing function of a relay of amplitude
+    # output / 2 producing an oscillation of this amplitude
+    ku = 4.0 * (output / 2) / (3.1416 * amplitude)
+    return 0.6 * ku, 1.2 * ku / period, 0.075 * ku * period
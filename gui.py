@@ -1,36 +1,134 @@
 import lvgl as lv
 import network
 import time
+import gc
+import _thread
+from logger import log
+
+
+class ToastPool:
+    """
+    Fixed pool of labels on the top layer for short-lived messages.
+    Labels and their hide timers are created once and reused round-robin.
+    """
+
+    def __init__(self, size=3, duration_ms=2000):
+        self._labels = []
+        self._timers = []
+        self._next = 0
+        for i in range(size):
+            label = lv.label(lv.layer_top())
+            label.align(lv.ALIGN.BOTTOM_MID, 0, -110 - 30 * i)
+            label.add_flag(lv.obj.FLAG.HIDDEN)
+            timer = lv.timer.create(self._make_hide_cb(label), duration_ms, None)
+            timer.pause()
+            self._labels.append(label)
+            self._timers.append(timer)
+
+    def _make_hide_cb(self, label):
+        def hide_cb(timer):
+            label.add_flag(lv.obj.FLAG.HIDDEN)
+            timer.pause()
+        return hide_cb
+
+    def show(self, text):
+        """Show a message on the next free (or oldest) label"""
+        label = self._labels[self._next]
+        timer = self._timers[self._next]
+        self._next = (self._next + 1) % len(self._labels)
+        label.set_text(text)
+        label.clear_flag(lv.obj.FLAG.HIDDEN)
+        timer.reset()
+        timer.resume()
+
 
 class BrewingGUI:
     def __init__(self, model):
         self.model = model
-        self.create_flashing_style()
+        self.dialog_open_us = 0
+        self.create_styles()
         self.build_ui()
+        self.build_settings_dialog()
+        self.build_autotune_panel()
+        self.build_error_screen()
+        self.toasts = ToastPool()
+
+        self.temp_flashing = False
+
+        # Values last shown by update(); labels and styles are only touched
+        # (and strings only formatted) when what they show changes
+        self._shown_temp = None
+        self._shown_setpoint = None
+        self._shown_eta = -1
+        self._shown_heater = None
+        self._shown_stage = None
+        self._shown_pump = None
+        self._shown_heat_state = None
+        self._shown_cycle = None
+        self.temp_flash_timer = lv.timer.create(self._temp_flash_cb, 500, None)
+        self.temp_flash_timer.pause()
+
+        lv.scr_load(self.scr)
+        self.update_ip_address()
+
         lv.timer.create(lambda t: self.update_wifi_icon(), 5000, None)
         lv.timer.create(lambda t: self.update_ip_address(), 10000, None)  # Update IP every 10 seconds
 
-    def create_flashing_style(self):
+    def create_styles(self):
+        """Create every style once; widgets share them"""
         self.flash_style = lv.style_t()
         self.flash_style.init()
         self.flash_style.set_text_color(lv.color_hex(0xFF0000))  # Red
 
+        # Bigger font for the temperature label
+        self.big_font_style = lv.style_t()
+        self.big_font_style.init()
+        # Use a built-in large font or custom font if available
+        # Example: lv.font_montserrat_48 (if available)
+        if hasattr(lv, 'font_montserrat_48'):
+            self.big_font_style.set_text_font(lv.font_montserrat_48)
+        else:
+            self.big_font_style.set_text_font(lv.font_default())
+
+        # Smaller font style for IP address
+        self.ip_style = lv.style_t()
+        self.ip_style.init()
+        self.ip_style.set_text_font(lv.font_default())  # Use default font but we'll make it smaller visually
+        self.ip_style.set_text_color(lv.color_hex(0x808080))  # Gray color
+
+        self.net_status_style = lv.style_t()
+        self.net_status_style.init()
+        self.net_status_style.set_text_color(lv.color_hex(0xFF0000))  # Red by default
+
+        self.error_style = lv.style_t()
+        self.error_style.init()
+        self.error_style.set_text_color(lv.color_hex(0xFF0000))
+
+        self.dialog_style = lv.style_t()
+        self.dialog_style.init()
+        self.dialog_style.set_bg_color(lv.color_hex(0xFFFFFF))
+        self.dialog_style.set_radius(10)
+
+    def add_network_labels(self, parent):
+        """IP address and network status labels, bottom of a screen"""
+        ip_label = lv.label(parent)
+        ip_label.set_text("IP: Connecting...")
+        ip_label.align(lv.ALIGN.BOTTOM_MID, 0, -10)
+        ip_label.add_style(self.ip_style, 0)
+
+        net_status = lv.label(parent)
+        net_status.set_text("●")
+        net_status.align(lv.ALIGN.BOTTOM_MID, -80, -10)
+        net_status.add_style(self.net_status_style, 0)
+        return ip_label, net_status
+
     def build_ui(self):
         self.scr = lv.obj()
 
         self.temp_label = lv.label(self.scr)
         self.temp_label.set_text("Temp: --°C")
         self.temp_label.align(lv.ALIGN.TOP_MID, 0, 10)
-        # Set bigger font for temperature label
-        big_font_style = lv.style_t()
-        big_font_style.init()
-        # Use a built-in large font or custom font if available
-        # Example: lv.font_montserrat_48 (if available)
-        if hasattr(lv, 'font_montserrat_48'):
-            big_font_style.set_text_font(lv.font_montserrat_48)
-        else:
-            big_font_style.set_text_font(lv.font_default())
-        self.temp_label.add_style(big_font_style, 0)
+        self.temp_label.add_style(self.big_font_style, 0)
 
         self.setpoint_label = lv.label(self.scr)
         self.setpoint_label.set_text("Setpoint: --°C")
@@ -75,22 +173,18 @@ class BrewingGUI:
         lv.label(self.btn_heat).set_text("Heater")
         self.btn_heat.add_event_cb(self.toggle_heater_ui, lv.EVENT.CLICKED, None)
 
+        # Time to strike (predicted time to reach setpoint)
+        self.eta_label = lv.label(self.scr)
+        self.eta_label.set_text("Strike in: --:--")
+        self.eta_label.align(lv.ALIGN.CENTER, 0, 20)
+
         # Stage/Status label
         self.stage_label = lv.label(self.scr)
         self.stage_label.set_text("Stage: Idle")
         self.stage_label.align(lv.ALIGN.CENTER, 0, 50)
 
         # IP Address label - bottom of screen, smaller text
-        self.ip_label = lv.label(self.scr)
-        self.ip_label.set_text("IP: Connecting...")
-        self.ip_label.align(lv.ALIGN.BOTTOM_MID, 0, -10)
-        
-        # Create smaller font style for IP address
-        self.ip_style = lv.style_t()
-        self.ip_style.init()
-        self.ip_style.set_text_font(lv.font_default())  # Use default font but we'll make it smaller visually
-        self.ip_style.set_text_color(lv.color_hex(0x808080))  # Gray color
-        self.ip_label.add_style(self.ip_style, 0)
+        self.ip_label, self.net_status = self.add_network_labels(self.scr)
 
         # Settings button
         self.btn_settings = lv.btn(self.scr)
@@ -98,19 +192,96 @@ class BrewingGUI:
         self.btn_settings.align(lv.ALIGN.TOP_RIGHT, -10, 180)
         lv.label(self.btn_settings).set_text("⚙️")
         self.btn_settings.add_event_cb(self.open_settings_dialog, lv.EVENT.CLICKED, None)
-        self.net_status = lv.label(self.scr)
-        self.net_status.set_text("●")
-        self.net_status.align(lv.ALIGN.BOTTOM_MID, -80, -10)
-        
-        self.net_status_style = lv.style_t()
-        self.net_status_style.init()
-        self.net_status_style.set_text_color(lv.color_hex(0xFF0000))  # Red by default
-        self.net_status.add_style(self.net_status_style, 0)
 
-        lv.scr_load(self.scr)
-        
-        # Initial IP update
-        self.update_ip_address()
+    def build_settings_dialog(self):
+        """Settings dialog, built hidden and shown by open_settings_dialog"""
+        self.settings_dialog = lv.obj(self.scr)
+        self.settings_dialog.set_size(300, 200)
+        self.settings_dialog.align(lv.ALIGN.CENTER, 0, 0)
+        self.settings_dialog.add_style(self.dialog_style, 0)
+
+        title = lv.label(self.settings_dialog)
+        title.set_text("Settings")
+        title.align(lv.ALIGN.TOP_MID, 0, 10)
+
+        # Auto-Tune button
+        btn_autotune = lv.btn(self.settings_dialog)
+        btn_autotune.set_size(180, 40)
+        btn_autotune.align(lv.ALIGN.CENTER, 0, 30)
+        lv.label(btn_autotune).set_text("Auto-Tune PID")
+        btn_autotune.add_event_cb(self.run_autotune, lv.EVENT.CLICKED, None)
+
+        # Calibration offset input
+        offset_label = lv.label(self.settings_dialog)
+        offset_label.set_text("Calibration Offset:")
+        offset_label.align(lv.ALIGN.CENTER, 0, 80)
+
+        self.offset_input = lv.textarea(self.settings_dialog)
+        self.offset_input.set_size(100, 30)
+        self.offset_input.align(lv.ALIGN.CENTER, 80, 80)
+
+        btn_set_offset = lv.btn(self.settings_dialog)
+        btn_set_offset.set_size(80, 30)
+        btn_set_offset.align(lv.ALIGN.CENTER, 0, 120)
+        lv.label(btn_set_offset).set_text("Set Offset")
+        btn_set_offset.add_event_cb(self.set_calibration_offset, lv.EVENT.CLICKED, None)
+
+        # Result of the last "Set Offset", rebound on each press
+        self.settings_msg = lv.label(self.settings_dialog)
+        self.settings_msg.set_text("")
+        self.settings_msg.align(lv.ALIGN.CENTER, 0, 150)
+
+        # Close button
+        btn_close = lv.btn(self.settings_dialog)
+        btn_close.set_size(80, 30)
+        btn_close.align(lv.ALIGN.BOTTOM_MID, 0, -10)
+        lv.label(btn_close).set_text("Close")
+        btn_close.add_event_cb(lambda e: self.close_settings_dialog(), lv.EVENT.CLICKED, None)
+
+        self.settings_dialog.add_flag(lv.obj.FLAG.HIDDEN)
+
+    def build_autotune_panel(self):
+        """Auto-tune progress panel, shown while auto_tune_pid runs"""
+        self.autotune_panel = lv.obj(self.scr)
+        self.autotune_panel.set_size(300, 120)
+        self.autotune_panel.align(lv.ALIGN.CENTER, 0, 0)
+        self.autotune_panel.add_style(self.dialog_style, 0)
+
+        title = lv.label(self.autotune_panel)
+        title.set_text("Auto-Tune PID")
+        title.align(lv.ALIGN.TOP_MID, 0, 10)
+
+        self.autotune_bar = lv.bar(self.autotune_panel)
+        self.autotune_bar.set_size(240, 20)
+        self.autotune_bar.align(lv.ALIGN.CENTER, 0, 10)
+        self.autotune_bar.set_range(0, 100)
+
+        self.autotune_label = lv.label(self.autotune_panel)
+        self.autotune_label.set_text("")
+        self.autotune_label.align(lv.ALIGN.BOTTOM_MID, 0, -5)
+
+        self.autotune_panel.add_flag(lv.obj.FLAG.HIDDEN)
+
+    def build_error_screen(self):
+        """Fault screen, loaded by show_error_screen"""
+        self.error_scr = lv.obj()
+
+        error_title = lv.label(self.error_scr)
+        error_title.set_text("⚠️ SYSTEM FAULT ⚠️")
+        error_title.align(lv.ALIGN.CENTER, 0, -50)
+        error_title.add_style(self.error_style, 0)
+
+        self.error_msg = lv.label(self.error_scr)
+        self.error_msg.align(lv.ALIGN.CENTER, 0, 0)
+
+        btn_ack = lv.btn(self.error_scr)
+        btn_ack.set_size(140, 40)
+        btn_ack.align(lv.ALIGN.CENTER, 0, 70)
+        lv.label(btn_ack).set_text("Acknowledge")
+        btn_ack.add_event_cb(lambda e: self.model.clear_fault(), lv.EVENT.CLICKED, None)
+
+        # Keep IP display even in error mode
+        self.error_ip_label, self.error_net_status = self.add_network_labels(self.error_scr)
 
     def get_ip_address(self):
         """Get current IP address"""
@@ -122,7 +293,7 @@ class BrewingGUI:
             else:
                 return "Not Connected"
         except Exception as e:
-            print(f"⚠️ Error getting IP: {e}")
+            log.warning("⚠️ Error getting IP: %s", e)
             return "Error"
 
     def update_ip_address(self):
@@ -130,11 +301,11 @@ class BrewingGUI:
         ip_addr = self.get_ip_address()
         
         if ip_addr == "Not Connected":
-            self.ip_label.set_text("IP: Not Connected")
+            text = "IP: Not Connected"
             # Set network status to red
             self.net_status_style.set_text_color(lv.color_hex(0xFF0000))  # Red
         elif ip_addr == "Error":
-            self.ip_label.set_text("IP: Error")
+            text = "IP: Error"
             # Set network status to orange
             self.net_status_style.set_text_color(lv.color_hex(0xFFA500))  # Orange
         else:
@@ -144,10 +315,14 @@ class BrewingGUI:
             else:
                 display_ip = ip_addr
             
-            self.ip_label.set_text(f"IP: {display_ip}")
+            text = f"IP: {display_ip}"
             # Set network status to green
             self.net_status_style.set_text_color(lv.color_hex(0x00FF00))  # Green
 
+        self.ip_label.set_text(text)
+        self.error_ip_label.set_text(text)
+        lv.obj.report_style_change(self.net_status_style)
+
     def toggle_heater_ui(self, event):
         self.model.toggle_heater_enabled()
         self.update_heater_visual()
@@ -158,62 +333,107 @@ class BrewingGUI:
         else:
             self.heater_bar.set_style_bg_color(lv.color_hex(0x808080), 0)  # Gray
 
-    def start_temp_flash(self):
-        def flash_cb(timer):
-            current_opacity = self.temp_label.get_style_text_opa(0)
-            new_opacity = lv.OPA.TRANSP if current_opacity == lv.OPA.COVER else lv.OPA.COVER
-            self.temp_label.set_style_text_opa(new_opacity, 0)
+    def _temp_flash_cb(self, timer):
+        current_opacity = self.temp_label.get_style_text_opa(0)
+        new_opacity = lv.OPA.TRANSP if current_opacity == lv.OPA.COVER else lv.OPA.COVER
+        self.temp_label.set_style_text_opa(new_opacity, 0)
 
-        self.temp_flash_timer = lv.timer.create(flash_cb, 500, None)
+    def start_temp_flash(self):
+        if not self.temp_flashing:
+            self.temp_flashing = True
+            self.temp_label.add_style(self.flash_style, 0)
+            self.temp_flash_timer.resume()
 
     def stop_temp_flash(self):
-        if hasattr(self, "temp_flash_timer"):
+        if self.temp_flashing:
+            self.temp_flashing = False
             self.temp_flash_timer.pause()
+            self.temp_label.remove_style(self.flash_style, 0)
             self.temp_label.set_style_text_opa(lv.OPA.COVER, 0)
 
-    def update(self, temp, setpoint, heater, pump, stage):
+    def update(self, temp, setpoint, heater, pump, stage, eta=None):
+        # Labels are only redrawn when the text would change: round() keys
+        # match the rounding of the :.1f formatting
         # Update temperature display
-        self.temp_label.set_text(f"Temp: {temp:.1f}°C")
-        self.setpoint_label.set_text(f"Setpoint: {setpoint:.1f}°C")
+        shown = round(temp * 10)
+        if shown != self._shown_temp:
+            self._shown_temp = shown
+            self.temp_label.set_text(f"Temp: {temp:.1f}°C")
+        shown = round(setpoint * 10)
+        if shown != self._shown_setpoint:
+            self._shown_setpoint = shown
+            self.setpoint_label.set_text(f"Setpoint: {setpoint:.1f}°C")
+
+        # Update time to strike
+        shown = None if eta is None else int(eta)
+        if shown != self._shown_eta:
+            self._shown_eta = shown
+            if shown is None:
+                self.eta_label.set_text("Strike in: --:--")
+            else:
+                self.eta_label.set_text(f"Strike in: {shown // 60:02d}:{shown % 60:02d}")
         
         # Update heater bar and label
-        self.heater_bar.set_value(int(heater), lv.ANIM.OFF)
-        self.heater_label.set_text(f"Heater: {heater:.1f}%")
-        self.update_heater_visual()
+        shown = round(heater * 10)
+        if shown != self._shown_heater:
+            self._shown_heater = shown
+            self.heater_bar.set_value(int(heater), lv.ANIM.OFF)
+            self.heater_label.set_text(f"Heater: {heater:.1f}%")
 
         # Update stage
-        self.stage_label.set_text(f"Stage: {stage}")
+        if stage != self._shown_stage:
+            self._shown_stage = stage
+            self.stage_label.set_text(f"Stage: {stage}")
 
         # Update pump button appearance
-        pump_btn_label = self.btn_pump.get_child(0)
-        if pump:
-            pump_btn_label.set_text("Pump ON")
-            self.btn_pump.set_style_bg_color(lv.color_hex(0x0080FF), 0)  # Blue when on
-        else:
-            pump_btn_label.set_text("Pump OFF")
-            self.btn_pump.set_style_bg_color(lv.color_hex(0x606060), 0)  # Gray when off
+        if pump != self._shown_pump:
+            self._shown_pump = pump
+            pump_btn_label = self.btn_pump.get_child(0)
+            if pump:
+                pump_btn_label.set_text("Pump ON")
+                self.btn_pump.set_style_bg_color(lv.color_hex(0x0080FF), 0)  # Blue when on
+            else:
+                pump_btn_label.set_text("Pump OFF")
+                self.btn_pump.set_style_bg_color(lv.color_hex(0x606060), 0)  # Gray when off
 
         # Update heater button appearance
-        heat_btn_label = self.btn_heat.get_child(0)
         if self.model.heater_enabled:
-            if self.model.heating_on and heater > 0:
+            heat_state = 2 if self.model.heating_on and heater > 0 else 1
+        else:
+            heat_state = 0
+        if heat_state != self._shown_heat_state:
+            self._shown_heat_state = heat_state
+            self.update_heater_visual()
+            heat_btn_label = self.btn_heat.get_child(0)
+            if heat_state == 2:
                 heat_btn_label.set_text("Heat ON")
                 self.btn_heat.set_style_bg_color(lv.color_hex(0xFF4000), 0)  # Red-orange when heating
-            else:
+            elif heat_state == 1:
                 heat_btn_label.set_text("Heat RDY")
                 self.btn_heat.set_style_bg_color(lv.color_hex(0xFF8000), 0)  # Orange when ready
-        else:
-            heat_btn_label.set_text("Heat OFF")
-            self.btn_heat.set_style_bg_color(lv.color_hex(0x606060), 0)  # Gray when disabled
+            else:
+                heat_btn_label.set_text("Heat OFF")
+                self.btn_heat.set_style_bg_color(lv.color_hex(0x606060), 0)  # Gray when disabled
 
         # Temperature sensor error handling
         if 0.0 <= temp <= 100.0:
-            self.temp_label.remove_style_all()
             self.stop_temp_flash()
         else:
-            self.temp_label.add_style(self.flash_style, 0)
             self.start_temp_flash()
 
+        # Auto-tune progress
+        cycle = self.model.autotune_cycle
+        if cycle is not None:
+            if cycle != self._shown_cycle:
+                self._shown_cycle = cycle
+                cycles = self.model.autotune_cycles
+                self.autotune_bar.set_value(100 * cycle // cycles, lv.ANIM.OFF)
+                self.autotune_label.set_text(f"Cycle {cycle}/{cycles}")
+        elif self._shown_cycle is not None:
+            self._shown_cycle = None
+            self.autotune_panel.add_flag(lv.obj.FLAG.HIDDEN)
+            self.toasts.show("Auto-tune finished")
+
     def update_wifi_icon(self):
         wlan = network.WLAN(network.STA_IF)
         if not wlan.isconnected():
@@ -233,36 +453,14 @@ class BrewingGUI:
         except:
             self.wifi_icon.set_text("📶")
 
-    def show_error_screen(self):
+    def show_error_screen(self, message=None):
         """Display error/fault screen"""
-        # Clear current screen
-        self.scr.clean()
-        
-        # Create error display
-        error_title = lv.label(self.scr)
-        error_title.set_text("⚠️ SYSTEM FAULT ⚠️")
-        error_title.align(lv.ALIGN.CENTER, 0, -50)
-        
-        error_style = lv.style_t()
-        error_style.init()
-        error_style.set_text_color(lv.color_hex(0xFF0000))
-        error_title.add_style(error_style, 0)
-        
-        error_msg = lv.label(self.scr)
-        error_msg.set_text("Temperature sensor fault\nHeating disabled for safety\nCheck sensor connections")
-        error_msg.align(lv.ALIGN.CENTER, 0, 0)
-        
-        # Keep IP display even in error mode
-        self.ip_label = lv.label(self.scr)
-        self.ip_label.align(lv.ALIGN.BOTTOM_MID, 0, -10)
-        self.ip_label.add_style(self.ip_style, 0)
-        
-        self.net_status = lv.label(self.scr)
-        self.net_status.set_text("●")
-        self.net_status.align(lv.ALIGN.BOTTOM_MID, -80, -10)
-        self.net_status.add_style(self.net_status_style, 0)
-        
-        self.update_ip_address()
+        self.error_msg.set_text(f"{message or 'Temperature sensor fault'}\nHeating disabled for safety\nCheck sensor connections")
+        lv.scr_load(self.error_scr)
+
+    def show_main_screen(self):
+        """Return from the error screen"""
+        lv.scr_load(self.scr)
 
     def get_network_info(self):
         """Get detailed network information for debugging"""
@@ -284,62 +482,68 @@ class BrewingGUI:
             return {'error': str(e)}
 
     def open_settings_dialog(self, event):
-        # Create a modal dialog
-        self.settings_dialog = lv.obj(self.scr)
-        self.settings_dialog.set_size(300, 200)
-        self.settings_dialog.align(lv.ALIGN.CENTER, 0, 0)
-        self.settings_dialog.set_style_bg_color(lv.color_hex(0xFFFFFF), 0)
-        self.settings_dialog.set_style_radius(10, 0)
-
-        title = lv.label(self.settings_dialog)
-        title.set_text("Settings")
-        title.align(lv.ALIGN.TOP_MID, 0, 10)
-
-        # Auto-Tune button
-        btn_autotune = lv.btn(self.settings_dialog)
-        btn_autotune.set_size(180, 40)
-        btn_autotune.align(lv.ALIGN.CENTER, 0, 30)
-        lv.label(btn_autotune).set_text("Auto-Tune PID")
-        btn_autotune.add_event_cb(self.run_autotune, lv.EVENT.CLICKED, None)
-
-        # Calibration offset input
-        offset_label = lv.label(self.settings_dialog)
-        offset_label.set_text("Calibration Offset:")
-        offset_label.align(lv.ALIGN.CENTER, 0, 80)
-
-        self.offset_input = lv.textarea(self.settings_dialog)
-        self.offset_input.set_size(100, 30)
-        self.offset_input.align(lv.ALIGN.CENTER, 80, 80)
+        start = time.ticks_us()
         self.offset_input.set_text(str(getattr(self.model.sensor, 'calibration_offset', 0.0)))
+        self.settings_msg.set_text("")
+        self.settings_dialog.clear_flag(lv.obj.FLAG.HIDDEN)
+        self.settings_dialog.move_foreground()
+        self.dialog_open_us = time.ticks_diff(time.ticks_us(), start)
+        log.debug("Settings dialog opened in %d us", self.dialog_open_us)
 
-        btn_set_offset = lv.btn(self.settings_dialog)
-        btn_set_offset.set_size(80, 30)
-        btn_set_offset.align(lv.ALIGN.CENTER, 0, 120)
-        lv.label(btn_set_offset).set_text("Set Offset")
-        btn_set_offset.add_event_cb(self.set_calibration_offset, lv.EVENT.CLICKED, None)
-
-        # Close button
-        btn_close = lv.btn(self.settings_dialog)
-        btn_close.set_size(80, 30)
-        btn_close.align(lv.ALIGN.BOTTOM_MID, 0, -10)
-        lv.label(btn_close).set_text("Close")
-        btn_close.add_event_cb(lambda e: self.settings_dialog.delete(), lv.EVENT.CLICKED, None)
+    def close_settings_dialog(self):
+        self.settings_dialog.add_flag(lv.obj.FLAG.HIDDEN)
 
     def set_calibration_offset(self, event):
         try:
             offset = float(self.offset_input.get_text())
             if hasattr(self.model, 'set_calibration_offset'):
                 self.model.set_calibration_offset(offset)
-            msg = lv.label(self.settings_dialog)
-            msg.set_text(f"Offset set to {offset}")
-            msg.align(lv.ALIGN.CENTER, 0, 150)
+            self.settings_msg.set_text(f"Offset set to {offset}")
         except Exception as e:
-            msg = lv.label(self.settings_dialog)
-            msg.set_text(f"Error: {e}")
-            msg.align(lv.ALIGN.CENTER, 0, 150)
+            self.settings_msg.set_text(f"Error: {e}")
+
+    def run_autotune(self, event):
+        # BrewingModel.auto_tune_pid refuses a second run; this only saves
+        # flashing up the progress panel for it
+        if self.model.autotune_cycle is not None:
+            self.toasts.show("Auto-tune already running")
+            return
+        self.close_settings_dialog()
+        self.autotune_bar.set_value(0, lv.ANIM.OFF)
+        self.autotune_label.set_text("Starting...")
+        self.autotune_panel.clear_flag(lv.obj.FLAG.HIDDEN)
+        self.autotune_panel.move_foreground()
+        _thread.start_new_thread(self.model.auto_tune_pid, ())
+
+    def measure_dialog_cycles(self, cycles=1000):
+        """
+        Open and close the settings dialog repeatedly and report the heap
+        change and mean open latency.  Used to check the GUI does not leak.
+        """
+        gc.collect()
+        free_before = gc.mem_free()
+        total_us = 0
+        for _ in range(cycles):
+            self.open_settings_dialog(None)
+            total_us += self.dialog_open_us
+            lv.task_handler()
+            self.close_settings_dialog()
+            lv.task_handler()
+        gc.collect()
+        free_after = gc.mem_free()
+        log.info("Dialog cycles: %d, mean open %d us, heap change %d bytes",
+                 cycles, total_us // cycles, free_before - free_after)
+        return total_us // cycles, free_before - free_after
 
 # --- Splash Screen ---
-def show_splash_screen(image_path):
+def show_splash_screen(image_path=None, next_screen=None, duration_ms=3000):
+    """
+    Show the splash screen for duration_ms, running LVGL so it is drawn,
+    then load next_screen and delete the splash.
+
+    :param image_path: Logo image; a text logo is shown without one
+    :param next_screen: Screen to return to (e.g. BrewingGUI.scr)
+    """
     splash = lv.obj()
     splash.set_size(480, 480)
     splash.center()
@@ -356,6 +560,8 @@ def show_splash_screen(image_path):
 
     # Try to load image, fallback to text if not available
     try:
+        if image_path is None:
+            raise ValueError
         img = lv.img(splash)
         img.set_src(image_path)
         img.align(lv.ALIGN.CENTER, 0, 0)
@@ -371,7 +577,17 @@ def show_splash_screen(image_path):
     version.align(lv.ALIGN.BOTTOM_MID, 0, -30)
 
     lv.scr_load(splash)
-    time.sleep(3)
+    # The LVGL loop isn't running yet, so drive it here while the splash shows
+    start = last = time.ticks_ms()
+    while time.ticks_diff(last, start) < duration_ms:
+        time.sleep_ms(20)
+        now = time.ticks_ms()
+        lv.tick_inc(time.ticks_diff(now, last))
+        last = now
+        lv.task_handler()
+    # Never delete the active screen: switch away from the splash first
+    if next_screen is not None:
+        lv.scr_load(next_screen)
     splash.delete()
 
 # --- GUI Update Hook (Legacy compatibility) ---
@@ -0,0 +1,134 @@
+# health.py - Incremental temperature sensor health monitoring
+
+FAULT_RANGE = "Sensor out of range"
+FAULT_STUCK = "Sensor reading stuck"
+FAULT_JUMP = "Sensor reading jumped"
+FAULT_NOISY = "Sensor reading noisy"
+FAULT_NO_RISE = "No temperature rise while heating"
+FAULT_READ = "Sensor read failed"
+
+
+class SensorHealthMonitor:
+    """
+    Constant-memory sensor fault classifier.
+
+    Keeps exponentially weighted statistics of the reading-to-reading change,
+    the flat-line duration and the rise expected from the applied heater power,
+    all updated in O(1) per tick.  The first fault detected is latched until
+    reset() is called.
+    """
+
+    def __init__(self, min_temp=0.0, max_temp=100.0, max_rate=1.0,
+                 max_variance=0.5, flat_epsilon=0.001, flat_timeout=120.0,
+                 heat_gain=0.00023, check_power=50.0, expected_rise=5.0,
+                 rise_ratio=0.3, boil_temp=98.0, smoothing=0.05):
+        """
+        :param min_temp: Lowest plausible reading (°C)
+        :param max_temp: Highest plausible reading (°C)
+        :param max_rate: Largest plausible change between readings (°C/s)
+        :param max_variance: Largest tolerated variance of the change (°C²)
+        :param flat_epsilon: Change below which a reading counts as flat (°C)
+        :param flat_timeout: Flat-line duration while heating before fault (s)
+        :param heat_gain: Expected rate of rise per % heater power (°C/s)
+        :param check_power: Minimum heater power for the rise check (%)
+        :param expected_rise: Expected rise (°C) after which the check runs
+        :param rise_ratio: Fraction of the expected rise that must be seen
+        :param boil_temp: Rise check is skipped above this temperature (°C)
+        :param smoothing: Weight of a new sample in the rolling statistics
+        """
+        self.min_temp = min_temp
+        self.max_temp = max_temp
+        self.max_rate = max_rate
+        self.max_variance = max_variance
+        self.flat_epsilon = flat_epsilon
+        self.flat_timeout = flat_timeout
+        self.heat_gain = heat_gain
+        self.check_power = check_power
+        self.expected_rise = expected_rise
+        self.rise_ratio = rise_ratio
+        self.boil_temp = boil_temp
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        """Clear the statistics and any latched fault"""
+        self.fault = None
+        self.rate = 0.0
+        self.mean_delta = 0.0
+        self.variance = 0.0
+        self.flat_time = 0.0
+        self._last_temp = None
+        self._rise_expected = 0.0
+        self._rise_actual = 0.0
+
+    def read_failed(self):
+        """
+        Record a reading that could not be converted at all (ADC at 0 or
+        full scale: open or shorted probe, loose connector).
+
+        :return: Latched fault description
+        """
+        if not self.fault:
+            self.fault = FAULT_READ
+        return self.fault
+
+    def update(self, temp, dt, power=0.0):
+        """
+        Feed one reading.
+
+        :param temp: Raw temperature reading (°C)
+        :param dt: Time since the previous reading in seconds
+        :param power: Heater power applied over the last interval (0-100)
+        :return: Latched fault description, or None while healthy
+        """
+        if self.fault:
+            return self.fault
+
+        if not (self.min_temp <= temp <= self.max_temp):
+            self.fault = FAULT_RANGE
+            return self.fault
+
+        last = self._last_temp
+        self._last_temp = temp
+        if last is None or dt <= 0.0:
+            return None
+
+        delta = temp - last
+        self.rate = delta / dt
+        if self.rate > self.max_rate or self.rate < -self.max_rate:
+            self.fault = FAULT_JUMP
+            return self.fault
+
+        # Exponentially weighted mean/variance of the change between readings
+        diff = delta - self.mean_delta
+        incr = self.smoothing * diff
+        self.mean_delta += incr
+        self.variance = (1.0 - self.smoothing) * (self.variance + diff * incr)
+        if self.variance > self.max_variance:
+            self.fault = FAULT_NOISY
+            return self.fault
+
+        # Flat line only matters while the element is running
+        if power > 0.0 and -self.flat_epsilon < delta < self.flat_epsilon:
+            self.flat_time += dt
+            if self.flat_time >= self.flat_timeout:
+                self.fault = FAULT_STUCK
+                return self.fault
+        else:
+            self.flat_time = 0.0
+
+        # Compare the rise seen against the rise the applied power should give
+        if power >= self.check_power and temp < self.boil_temp:
+            self._rise_expected += self.heat_gain * power * dt
+            self._rise_actual += delta
+            if self._rise_expected >= self.expected_rise:
+                if self._rise_actual < self._rise_expected * self.rise_ratio:
+                    self.fault = FAULT_NO_RISE
+                    return self.fault
+                self._rise_expected = 0.0
+                self._rise_actual = 0.0
+        else:
+            self._rise_expected = 0.0
+            self._rise_actual = 0.0
+
+        return None
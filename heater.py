@@ -0,0 +1,145 @@
+# heater.py - Heater output stage for the SSR driven Digiboil element
+
+from machine import Pin, PWM, Timer
+import time
+
+MODE_PWM = "pwm"        # Plain hardware PWM (duty_u16)
+MODE_WINDOW = "window"  # Slow time-proportioning windows
+MODE_BURST = "burst"    # Whole mains half-cycles, spread evenly
+
+FULL_SCALE = 65535
+
+
+class HeaterOutput:
+    """
+    Drives the heater SSR from a 0-100 % power demand.
+
+    In burst mode the output is re-evaluated once per mains half-cycle and a
+    Bresenham-style accumulator spreads the on half-cycles evenly, so a
+    zero-cross SSR only ever switches whole half-cycles.  Window mode turns
+    the element on for a proportion of a slow window.  Both honour a minimum
+    on/off time and count switching events per minute.
+    """
+
+    def __init__(self, pin, mode=MODE_BURST, freq=1000, window_ms=2000,
+                 mains_hz=50, min_on_ms=0, min_off_ms=0):
+        """
+        :param pin: Pin number driving the SSR
+        :param mode: MODE_PWM, MODE_WINDOW or MODE_BURST
+        :param freq: PWM frequency for MODE_PWM
+        :param window_ms: Time-proportioning window length for MODE_WINDOW
+        :param mains_hz: Mains frequency, sets the half-cycle tick
+        :param min_on_ms: Minimum time the element stays on once switched on
+        :param min_off_ms: Minimum time the element stays off once switched off
+        """
+        self.pin_id = pin
+        self.freq = freq
+        self.window_ms = window_ms
+        self.tick_ms = 1000 // (2 * mains_hz)
+        self.min_on_ms = min_on_ms
+        self.min_off_ms = min_off_ms
+
+        self.mode = None
+        self.power = 0.0
+        self.level = 0  # demand in duty_u16 units
+        self.state = False
+
+        self.switch_count = 0
+        self.switches_per_minute = 0
+        self._minute_start = time.ticks_ms()
+        self._last_switch = self._minute_start
+
+        self._accumulator = 0
+        self._window_pos = 0
+        self._pin = None
+        self._pwm = None
+        self._timer = Timer(-1)
+
+        self.set_mode(mode)
+
+    def set_mode(self, mode):
+        """Switch output mode; the element is turned off during the change"""
+        if mode not in (MODE_PWM, MODE_WINDOW, MODE_BURST):
+            raise ValueError(f"Unknown heater mode: {mode}")
+
+        self._timer.deinit()
+        if self._pwm is not None:
+            self._pwm.duty_u16(0)
+            self._pwm.deinit()
+            self._pwm = None
+
+        self.mode = mode
+        self.state = False
+        self._accumulator = 0
+        self._window_pos = 0
+
+        if mode == MODE_PWM:
+            self._pin = None
+            self._pwm = PWM(Pin(self.pin_id), freq=self.freq)
+            self._pwm.duty_u16(self.level)
+        else:
+            self._pin = Pin(self.pin_id, Pin.OUT)
+            self._pin.value(0)
+            self._timer.init(period=self.tick_ms, mode=Timer.PERIODIC,
+                             callback=lambda t: self.tick())
+
+    def set_power(self, power):
+        """
+        Set the power demand.
+
+        :param power: Heater power, 0-100 %
+        """
+        if power < 0:
+            power = 0
+        elif power > 100:
+            power = 100
+        self.power = power
+        self.level = int(power * FULL_SCALE / 100)
+        if self._pwm is not None:
+            self._pwm.duty_u16(self.level)
+            # Every PWM period switches on and off once
+            partial = 0 < self.level < FULL_SCALE
+            self.switches_per_minute = 120 * self.freq if partial else 0
+
+    def off(self):
+        """Turn the element off immediately, ignoring the minimum on time"""
+        self.set_power(0)
+        self._accumulator = 0
+        if self._pin is not None and self.state:
+            self._pin.value(0)
+            self._switched(False, time.ticks_ms())
+
+    def tick(self):
+        """Per half-cycle update for the window and burst modes"""
+        if self.mode == MODE_BURST:
+            self._accumulator += self.level
+            want = self._accumulator >= FULL_SCALE
+            if want:
+                self._accumulator -= FULL_SCALE
+        else:
+            self._window_pos += self.tick_ms
+            if self._window_pos >= self.window_ms:
+                self._window_pos = 0
+            want = self._window_pos * FULL_SCALE < self.level * self.window_ms
+
+        now = time.ticks_ms()
+        if want != self.state:
+            held = time.ticks_diff(now, self._last_switch)
+            if held < (self.min_on_ms if self.state else self.min_off_ms):
+                # Keep the current state but carry the difference forward so
+                # the average power is still delivered
+                if self.mode == MODE_BURST:
+                    self._accumulator += FULL_SCALE if want else -FULL_SCALE
+            else:
+                self._pin.value(1 if want else 0)
+                self._switched(want, now)
+
+        if time.ticks_diff(now, self._minute_start) >= 60000:
+            self.switches_per_minute = self.switch_count
+            self.switch_count = 0
+            self._minute_start = now
+
+    def _switched(self, state, now):
+        self.state = state
+        self._last_switch = now
+        self.switch_count += 1
@@ -0,0 +1,276 @@
+# history.py - In-RAM temperature history with on-device downsampling
+#
+# Samples are kept at several resolutions (raw, then buckets `factor` times
+# wider at each level), so a range query reads from the coarsest level that
+# still has enough detail and touches about points * factor entries however
+# long the requested span is.
+#
+# Query response layout (little-endian), as served by /api/history:
+#   header   <2sBBHIIf  magic b'BH', version, column count, point count,
+#                       device time now (s), first bucket start (s),
+#                       bucket width (s); bucket i covers
+#                       start + i * width .. start + (i + 1) * width
+#   columns  point count float32 values each, in COLUMNS order; buckets
+#            without samples are NaN
+
+import struct
+import time
+from array import array
+
+MAGIC = b'BH'
+VERSION = 1
+HEADER_FORMAT = '<2sBBHIIf'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+COLUMNS = ('temp', 'temp_min', 'temp_max', 'setpoint', 'duty')
+MAX_POINTS = 500
+
+_NAN = float('nan')
+
+
+class _Level:
+    """One resolution of the history: a ring of fixed-width buckets"""
+
+    def __init__(self, capacity, width, raw):
+        self.capacity = capacity
+        self.width = width
+        self.t = array('I', [0] * capacity)
+        self.temp = array('f', [0.0] * capacity)
+        self.setpoint = array('f', [0.0] * capacity)
+        self.duty = array('f', [0.0] * capacity)
+        if raw:
+            # A raw sample is its own mean, minimum and maximum
+            self.count = None
+            self.tmin = self.tmax = self.temp
+        else:
+            self.count = array('H', [0] * capacity)
+            self.tmin = array('f', [0.0] * capacity)
+            self.tmax = array('f', [0.0] * capacity)
+        self.head = 0
+        self.size = 0
+
+        # Bucket currently being filled (aggregated levels only)
+        self._bucket = -1
+        self._n = 0
+        self._sum = 0.0
+        self._min = 0.0
+        self._max = 0.0
+        self._sp = 0.0
+        self._duty = 0.0
+
+    def append(self, t, count, temp, tmin, tmax, setpoint, duty):
+        i = self.head
+        self.t[i] = t
+        self.temp[i] = temp
+        self.setpoint[i] = setpoint
+        self.duty[i] = duty
+        if self.count is not None:
+            self.count[i] = count
+            self.tmin[i] = tmin
+            self.tmax[i] = tmax
+        self.head = i + 1 if i + 1 < self.capacity else 0
+        if self.size < self.capacity:
+            self.size += 1
+
+    def add(self, now, temp, setpoint, duty):
+        """Fold a raw sample into the current bucket, closing it when due"""
+        bucket = now // self.width
+        if bucket != self._bucket:
+            n = self._n
+            if n:
+                self.append(self._bucket * self.width, n, self._sum / n,
+                            self._min, self._max, self._sp / n, self._duty / n)
+            self._bucket = bucket
+            self._n = 0
+            self._sum = self._sp = self._duty = 0.0
+            self._min = self._max = temp
+        self._n += 1
+        self._sum += temp
+        self._sp += setpoint
+        self._duty += duty
+        if temp < self._min:
+            self._min = temp
+        if temp > self._max:
+            self._max = temp
+
+    def find(self, t):
+        """Logical index (0 = oldest) of the first entry at or after t"""
+        lo = 0
+        hi = self.size
+        start = self.head - self.size
+        cap = self.capacity
+        times = self.t
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if times[(start + mid) % cap] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+class HistoryBuffer:
+    """
+    Fixed-size history of temperature, setpoint and heater duty, recorded
+    once per control tick.  All storage is allocated up front; the defaults
+    keep two hours of one-second samples in about 135 KB (PSRAM on the
+    ESP32-4848S040).
+    """
+
+    def __init__(self, capacity=7200, interval=1, factor=10, levels=3):
+        """
+        :param capacity: Raw samples kept
+        :param interval: Nominal seconds between samples
+        :param factor: Bucket width ratio between successive levels
+        :param levels: Number of resolutions, including the raw one
+        """
+        self.interval = interval
+        self._levels = [_Level(capacity, interval, True)]
+        width = interval
+        for _ in range(1, levels):
+            width *= factor
+            capacity = capacity // factor + 1
+            self._levels.append(_Level(capacity, width, False))
+        self._last = -1
+        self._out = bytearray(HEADER_SIZE + MAX_POINTS * len(COLUMNS) * 4)
+
+    def record(self, temp, setpoint, duty, now=None):
+        """
+        Add one sample.
+
+        :param now: Timestamp in whole seconds (default time.time())
+        """
+        if now is None:
+            now = int(time.time())
+        if now <= self._last:
+            # Same second as the previous sample, or the clock stepped back
+            return
+        self._last = now
+        self._levels[0].append(now, 1, temp, temp, temp, setpoint, duty)
+        for level in self._levels[1:]:
+            level.add(now, temp, setpoint, duty)
+
+    def query(self, t_from=None, t_to=None, points=200):
+        """
+        Downsample [t_from, t_to) into at most `points` buckets of mean,
+        minimum and maximum temperature, mean setpoint and mean duty.
+
+        The result is written into a buffer owned by this object and stays
+        valid until the next query.
+
+        :param t_from: Start time (s); negative values are relative to the
+                       newest sample.  None, or anything before the oldest
+                       sample, means the oldest sample
+        :param t_to: End time (s), relative when negative; None means now
+        :param points: Requested number of points, up to MAX_POINTS
+        :return: memoryview of the encoded response
+        """
+        raw = self._levels[0]
+        now = self._last if self._last >= 0 else 0
+        if t_to is None:
+            t_to = now + 1
+        elif t_to < 0:
+            t_to = max(0, t_to + now)
+        oldest = raw.t[(raw.head - raw.size) % raw.capacity] if raw.size else t_to
+        if t_from is None:
+            t_from = oldest
+        elif t_from < 0:
+            t_from += now
+        if t_from < oldest:
+            # Nothing is stored before the oldest sample; start the buckets
+            # there rather than spreading them over an empty (or negative,
+            # shortly after power-on) range
+            t_from = oldest
+        span = t_to - t_from
+        if span <= 0:
+            span = 0
+            points = 0
+        else:
+            points = max(1, min(points, MAX_POINTS))
+            step = span / points
+            if step < self.interval:
+                step = self.interval
+                points = -(-span // self.interval)
+
+        out = self._out
+        if points:
+            # Coarsest level whose buckets are no wider than an output point
+            top = 0
+            for k, level in enumerate(self._levels):
+                if level.width <= step:
+                    top = k
+            self._fill(out, t_from, t_to, step, points, top)
+        else:
+            step = float(self.interval)
+        struct.pack_into(HEADER_FORMAT, out, 0, MAGIC, VERSION, len(COLUMNS),
+                         points, now, t_from, step)
+        return memoryview(out)[:HEADER_SIZE + points * len(COLUMNS) * 4]
+
+    def _fill(self, out, t_from, t_to, step, points, top):
+        col = points * 4
+        cur = -1
+        n = 0
+        total = sp = duty = 0.0
+        lo = hi = 0.0
+        pos = t_from
+        for k in range(top, -1, -1):
+            level = self._levels[k]
+            cap = level.capacity
+            start = level.head - level.size
+            times = level.t
+            counts = level.count
+            i = level.find(pos)
+            last = -1
+            while i < level.size:
+                j = (start + i) % cap
+                t = times[j]
+                if t >= t_to:
+                    break
+                b = int((t - t_from) / step)
+                if b >= points:
+                    b = points - 1
+                if b != cur:
+                    if n:
+                        _pack(out, HEADER_SIZE + cur * 4, col, total / n, lo, hi,
+                              sp / n, duty / n)
+                    _blank(out, col, cur + 1, b)
+                    cur = b
+                    n = 0
+                    total = sp = duty = 0.0
+                    lo = level.tmin[j]
+                    hi = level.tmax[j]
+                c = counts[j] if counts is not None else 1
+                n += c
+                total += level.temp[j] * c
+                sp += level.setpoint[j] * c
+                duty += level.duty[j] * c
+                v = level.tmin[j]
+                if v < lo:
+                    lo = v
+                v = level.tmax[j]
+                if v > hi:
+                    hi = v
+                last = t
+                i += 1
+            if last >= 0:
+                # Finer levels only fill in what this one has not closed yet
+                pos = last + level.width
+        if n:
+            _pack(out, HEADER_SIZE + cur * 4, col, total / n, lo, hi, sp / n,
+                  duty / n)
+        _blank(out, col, cur + 1, points)
+
+
+def _pack(out, offset, col, temp, tmin, tmax, setpoint, duty):
+    struct.pack_into('<f', out, offset, temp)
+    struct.pack_into('<f', out, offset + col, tmin)
+    struct.pack_into('<f', out, offset + 2 * col, tmax)
+    struct.pack_into('<f', out, offset + 3 * col, setpoint)
+    struct.pack_into('<f', out, offset + 4 * col, duty)
+
+
+def _blank(out, col, first, end):
+    """Mark buckets first..end-1 as empty"""
+    for b in range(first, end):
+        offset = HEADER_SIZE + b * 4
+        for c in range(len(COLUMNS)):
+            struct.pack_into('<f', out, offset + c * col, _NAN)
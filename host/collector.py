@@ -0,0 +1,200 @@
+# collector.py - Host-side fleet telemetry collector
+#
+# Receives the UDP datagrams sent by telemetry.TelemetrySender from any number
+# of controllers, tracks sequence gaps per controller and appends every field
+# to its own column file:
+#
+#     python host/collector.py --port 4210 --out telemetry_data
+#     python host/collector.py --group 239.1.2.3 --out telemetry_data
+#
+# Column files are raw little-endian arrays (see COLUMNS) under
+# <out>/<controller id>/<column>.bin and load directly with numpy.fromfile.
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import struct
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetry import (DEFAULT_PORT, HEADER_FORMAT, HEADER_SIZE, MAGIC,  # noqa: E402
+                       RECORD_FORMAT, RECORD_SIZE, VERSION)
+
+# (column name, array typecode, numpy dtype) in record order
+COLUMNS = (
+    ('seq', 'I', '<u4'),
+    ('t_ms', 'I', '<u4'),
+    ('temp', 'f', '<f4'),
+    ('setpoint', 'f', '<f4'),
+    ('duty', 'f', '<f4'),
+    ('p', 'f', '<f4'),
+    ('i', 'f', '<f4'),
+    ('d', 'f', '<f4'),
+    ('flags', 'H', '<u2'),
+)
+
+# A sequence number this far behind the expected one means the controller
+# restarted rather than a late packet
+RESTART_WINDOW = 1000
+
+
+class ColumnStore:
+    """Buffers records per column and appends them to one file per column"""
+
+    def __init__(self, path, flush_records=4096):
+        self.path = path
+        self.flush_records = flush_records
+        os.makedirs(path, exist_ok=True)
+        schema = os.path.join(path, 'schema.json')
+        if not os.path.exists(schema):
+            with open(schema, 'w') as f:
+                json.dump({name: dtype for name, _, dtype in COLUMNS}, f)
+        self._columns = [array(code) for _, code, _ in COLUMNS]
+        self.pending = 0
+
+    def append(self, values):
+        for column, value in zip(self._columns, values):
+            column.append(value)
+        self.pending += 1
+        if self.pending >= self.flush_records:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        for (name, code, _), column in zip(COLUMNS, self._columns):
+            if sys.byteorder != 'little':
+                column.byteswap()
+            with open(os.path.join(self.path, name + '.bin'), 'ab') as f:
+                column.tofile(f)
+            del column[:]
+        self.pending = 0
+
+
+class ControllerState:
+    """Per-controller sequence tracking"""
+
+    def __init__(self, store):
+        self.store = store
+        self.expected = None
+        self.records = 0
+        self.missing = 0
+        self.late = 0
+        self.restarts = 0
+        self.last_seen = 0.0
+
+    def accept(self, seq):
+        """Update gap counters for a record's sequence number"""
+        if self.expected is None or seq == self.expected:
+            pass
+        elif seq > self.expected:
+            self.missing += seq - self.expected
+        elif self.expected - seq > RESTART_WINDOW:
+            self.restarts += 1
+        else:
+            # Late or duplicated record that was already counted as missing
+            self.late += 1
+            if self.missing:
+                self.missing -= 1
+            return
+        self.expected = seq + 1
+
+
+class Collector(asyncio.DatagramProtocol):
+    """Decodes telemetry datagrams and routes records to per-controller stores"""
+
+    def __init__(self, out_dir, flush_records=4096):
+        self.out_dir = out_dir
+        self.flush_records = flush_records
+        self.controllers = {}
+        self.packets = 0
+        self.records = 0
+        self.bad_packets = 0
+        self._record = struct.Struct(RECORD_FORMAT)
+
+    def datagram_received(self, data, addr):
+        if len(data) < HEADER_SIZE:
+            self.bad_packets += 1
+            return
+        magic, version, count, controller_id = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != MAGIC or version != VERSION or \
+                len(data) != HEADER_SIZE + count * RECORD_SIZE:
+            self.bad_packets += 1
+            return
+
+        state = self.controllers.get(controller_id)
+        if state is None:
+            store = ColumnStore(os.path.join(self.out_dir, str(controller_id)),
+                                self.flush_records)
+            state = self.controllers[controller_id] = ControllerState(store)
+        state.last_seen = time.time()
+
+        self.packets += 1
+        for values in self._record.iter_unpack(memoryview(data)[HEADER_SIZE:]):
+            state.accept(values[0])
+            state.store.append(values)
+            state.records += 1
+        self.records += count
+
+    def flush(self):
+        for state in self.controllers.values():
+            state.store.flush()
+
+    def summary(self):
+        missing = sum(s.missing for s in self.controllers.values())
+        return (f"{len(self.controllers)} controllers, {self.packets} packets, "
+                f"{self.records} records, {missing} missing, "
+                f"{self.bad_packets} bad packets")
+
+
+def open_socket(port, group=None, rcvbuf=4 * 1024 * 1024):
+    """UDP socket bound to port, joined to a multicast group if given"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    except OSError:
+        pass
+    sock.bind(('', port))
+    if group:
+        mreq = struct.pack('4s4s', socket.inet_aton(group), socket.inet_aton('0.0.0.0'))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+    sock.setblocking(False)
+    return sock
+
+
+async def run(port, out_dir, group=None, report_every=10.0):
+    loop = asyncio.get_running_loop()
+    collector = Collector(out_dir)
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: collector, sock=open_socket(port, group))
+    print(f"Collecting telemetry on UDP {port} into {out_dir}")
+    try:
+        while True:
+            await asyncio.sleep(report_every)
+            collector.flush()
+            print(collector.summary())
+    finally:
+        collector.flush()
+        transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fleet telemetry collector')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--group', help='multicast group to join')
+    parser.add_argument('--out', default='telemetry_data')
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.port, args.out, args.group))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# history_fetch.py - Fetch downsampled history from a controller
+#
+#     python host/history_fetch.py 192.168.1.50 --last 7200 --points 300 > brew.csv
+#
+# Requests the binary columnar format from /api/history and writes CSV with
+# one row per bucket; empty buckets are left blank.
+
+import argparse
+import http.client
+import math
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import COLUMNS, HEADER_FORMAT, HEADER_SIZE, MAGIC  # noqa: E402
+
+
+def fetch(host, t_from, t_to=None, points=200):
+    """Return (device now, bucket start times, {column: values})"""
+    url = f'/api/history?from={t_from}&points={points}'
+    if t_to is not None:
+        url += f'&to={t_to}'
+    conn = http.client.HTTPConnection(host, 80, timeout=10)
+    conn.request('GET', url)
+    response = conn.getresponse()
+    data = response.read()
+    conn.close()
+    if response.status != 200:
+        raise RuntimeError(f"GET {url}: {response.status}")
+
+    magic, _, ncols, n, now, start, step = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != MAGIC or ncols != len(COLUMNS):
+        raise RuntimeError("Unexpected history format")
+    columns = {}
+    for c, name in enumerate(COLUMNS):
+        columns[name] = struct.unpack_from(f'<{n}f', data, HEADER_SIZE + c * n * 4)
+    times = [start + i * step for i in range(n)]
+    return now, times, columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch controller history as CSV')
+    parser.add_argument('host', help='controller IP address')
+    parser.add_argument('--last', type=int, default=7200, help='seconds of history')
+    parser.add_argument('--points', type=int, default=200)
+    args = parser.parse_args()
+    try:
+        now, times, columns = fetch(args.host, -args.last, points=args.points)
+    except (OSError, RuntimeError) as e:
+        print(f"Fetch failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print('seconds_ago,' + ','.join(COLUMNS))
+    for i, t in enumerate(times):
+        values = ('' if math.isnan(columns[name][i]) else f'{columns[name][i]:.2f}'
+                  for name in COLUMNS)
+        print(f'{now - t:.0f},' + ','.join(values))
+
+
+if __name__ == '__main__':
+    main()
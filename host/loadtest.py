@@ -0,0 +1,115 @@
+# loadtest.py - Drive the fleet collector with many simulated controllers
+#
+#     python host/loadtest.py --controllers 200 --rate 10 --batch 5 --seconds 10
+#
+# Each simulated controller uses the real telemetry.TelemetrySender.  A small
+# fraction of datagrams is deliberately skipped so the collector's gap
+# detection can be checked against the known loss.
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collector import Collector, open_socket  # noqa: E402
+from telemetry import TelemetrySender  # noqa: E402
+
+
+class FakeModel:
+    """Just the attributes TelemetrySender reads"""
+
+    class _PID:
+        p_term = 1.0
+        i_term = 2.0
+        d_term = -0.5
+
+    def __init__(self, rng):
+        self.temperature = rng.uniform(20.0, 100.0)
+        self.setpoint = 66.0
+        self.heater_power = 50.0
+        self.heater_enabled = True
+        self.heating_on = True
+        self.pump_on = False
+        self.fault = None
+        self.active_pid = self._PID()
+
+
+async def simulate(sender, model, rate, seconds, drop, rng, stats):
+    interval = 1.0 / rate
+    start = time.monotonic()
+    tick = 0
+    while time.monotonic() - start < seconds:
+        model.temperature += rng.gauss(0.0, 0.05)
+        if sender._count == 0 and rng.random() < drop:
+            # Lose this whole datagram
+            sender.seq += sender.batch
+            stats['dropped'] += sender.batch
+            tick += sender.batch
+        else:
+            sender.record(model, now=int(tick * interval * 1000))
+            tick += 1
+        await asyncio.sleep(interval)
+
+
+async def run(args):
+    out_dir = tempfile.mkdtemp(prefix='telemetry_load_')
+    loop = asyncio.get_running_loop()
+    collector = Collector(out_dir)
+    sock = open_socket(args.port)
+    transport, _ = await loop.create_datagram_endpoint(lambda: collector, sock=sock)
+
+    rng = random.Random(0)
+    stats = {'dropped': 0}
+    senders = [TelemetrySender('127.0.0.1', args.port, controller_id=i,
+                               batch=args.batch)
+               for i in range(args.controllers)]
+
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    await asyncio.gather(*(
+        simulate(s, FakeModel(rng), args.rate, args.seconds, args.drop, rng, stats)
+        for s in senders))
+    for s in senders:
+        s.flush()
+    await asyncio.sleep(0.5)
+    wall = time.monotonic() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    collector.flush()
+    transport.close()
+
+    sent = sum(s.seq for s in senders) - stats['dropped']
+    missing = sum(c.missing for c in collector.controllers.values())
+    print(f"controllers        {args.controllers}")
+    print(f"records sent       {sent}")
+    print(f"records received   {collector.records} ({collector.packets} packets)")
+    # Losses after a controller's last received datagram cannot be detected
+    print(f"records dropped    {stats['dropped']} (detected missing: {missing})")
+    print(f"throughput         {collector.records / wall:.0f} records/s")
+    print(f"process CPU        {100.0 * cpu / wall:.0f}% of one core "
+          f"(senders and collector together)")
+    shutil.rmtree(out_dir)
+    return collector.records == sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Telemetry collector load test')
+    parser.add_argument('--controllers', type=int, default=200)
+    parser.add_argument('--rate', type=float, default=10.0, help='ticks/s per controller')
+    parser.add_argument('--batch', type=int, default=5)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--drop', type=float, default=0.01, help='datagram loss to simulate')
+    parser.add_argument('--port', type=int, default=42100)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# ota_upload.py - Push application files to a controller over the air
+#
+#     python host/ota_upload.py 192.168.1.50 main.py model.py www/index.html.gz
+#
+# The token must match OTA_TOKEN in the controller's main.py; pass it with
+# --token or the OTA_TOKEN environment variable.
+#
+# Paths are sent relative to the repository root, which matches the layout
+# on the controller's flash.  The controller keeps controlling while files
+# stream in, and reboots into the update after the final commit.
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import sys
+import time
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def request(host, method, url, body=None, headers=None):
+    conn = http.client.HTTPConnection(host, 80, timeout=60)
+    conn.request(method, url, body=body, headers=headers or {})
+    response = conn.getresponse()
+    data = response.read()
+    conn.close()
+    result = json.loads(data) if data else {}
+    if response.status != 200:
+        raise RuntimeError(f"{method} {url}: {response.status} {result.get('error', '')}")
+    return result
+
+
+def upload(host, paths, version, token):
+    files = {}
+    for path in paths:
+        rel = os.path.relpath(os.path.abspath(path), ROOT).replace(os.sep, '/')
+        files[rel] = (os.path.join(ROOT, rel), sha256_file(path))
+
+    manifest = {'version': version, 'files': {rel: h for rel, (_, h) in files.items()}}
+    auth = {'Authorization': 'Bearer ' + token}
+    request(host, 'POST', '/api/ota/begin', json.dumps(manifest),
+            dict(auth, **{'Content-Type': 'application/json'}))
+
+    total = 0
+    start = time.monotonic()
+    for rel, (path, _) in files.items():
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            result = request(host, 'PUT', '/api/ota/file?path=' + quote(rel, safe=''),
+                             f, dict(auth, **{'Content-Length': str(size)}))
+        total += size
+        print(f"{rel:<30} {size:8d} bytes  {result['kbps']:6.1f} KB/s on device")
+
+    elapsed = time.monotonic() - start
+    print(f"{len(files)} files, {total} bytes, {total / 1024 / elapsed:.1f} KB/s overall")
+    request(host, 'POST', '/api/ota/commit', headers=auth)
+    print("Committed; controller is rebooting into the update")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Over-the-air update uploader')
+    parser.add_argument('host', help='controller IP address')
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--version', default=time.strftime('%Y%m%d-%H%M%S'))
+    parser.add_argument('--token', default=os.environ.get('OTA_TOKEN'),
+                        help='shared OTA token (default: $OTA_TOKEN)')
+    args = parser.parse_args()
+    if not args.token:
+        parser.error('an OTA token is required (--token or OTA_TOKEN)')
+    try:
+        upload(args.host, args.files, args.version, args.token)
+    except (OSError, RuntimeError) as e:
+        print(f"Update failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
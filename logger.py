@@ -0,0 +1,136 @@
+# logger.py - Levelled, rate-limited, ring-buffered logging
+
+import os
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+_LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARN", ERROR: "ERROR"}
+
+
+class FileSink:
+    """Appends log lines to a file on flash, rotating it at max_bytes"""
+
+    def __init__(self, path="log.txt", max_bytes=16384):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._size = 0
+        try:
+            self._size = os.stat(path)[6]
+        except OSError:
+            pass
+
+    def __call__(self, line):
+        if self._size + len(line) + 1 > self.max_bytes:
+            try:
+                os.rename(self.path, self.path + ".1")
+            except OSError:
+                pass
+            self._size = 0
+        with open(self.path, "a") as f:
+            f.write(line)
+            f.write("\n")
+        self._size += len(line) + 1
+
+
+class Logger:
+    """
+    Logger for the control and UI loops.
+
+    Messages use deferred %-formatting, so a call below the current level only
+    costs a comparison.  Each call site (identified by its format string) is
+    rate limited; suppressed repeats are counted and reported with the next
+    emitted line.  Emitted lines are kept in a fixed-size ring buffer for the
+    /api/log endpoint and passed to any extra sinks.
+    """
+
+    def __init__(self, level=INFO, capacity=64, min_interval_ms=1000,
+                 console=True):
+        """
+        :param level: Lowest level that is emitted
+        :param capacity: Number of lines kept in the ring buffer
+        :param min_interval_ms: Minimum time between lines from one call site
+        :param console: Also print emitted lines to the console
+        """
+        self.level = level
+        self.min_interval_ms = min_interval_ms
+        self.console = console
+        self.sinks = []
+
+        self._ring = [None] * capacity
+        self._head = 0
+        self._count = 0
+        self._sites = {}
+
+    def enabled(self, level):
+        """Check whether a level would be emitted"""
+        return level >= self.level
+
+    def add_sink(self, sink):
+        """Register a callable that receives every emitted line"""
+        self.sinks.append(sink)
+
+    def debug(self, fmt, *args):
+        if DEBUG >= self.level:
+            self._log(DEBUG, fmt, args)
+
+    def info(self, fmt, *args):
+        if INFO >= self.level:
+            self._log(INFO, fmt, args)
+
+    def warning(self, fmt, *args):
+        if WARNING >= self.level:
+            self._log(WARNING, fmt, args)
+
+    def error(self, fmt, *args):
+        if ERROR >= self.level:
+            self._log(ERROR, fmt, args)
+
+    def _log(self, level, fmt, args):
+        now = time.ticks_ms()
+        site = self._sites.get(fmt)
+        if site is None:
+            site = self._sites[fmt] = [now, 0]
+        elif time.ticks_diff(now, site[0]) < self.min_interval_ms:
+            site[1] += 1
+            return
+
+        suppressed = site[1]
+        site[0] = now
+        site[1] = 0
+
+        try:
+            msg = fmt % args if args else fmt
+        except Exception:
+            msg = f"{fmt} {args}"
+        if suppressed:
+            msg = f"{msg} ({suppressed} suppressed)"
+        line = f"{now} {_LEVEL_NAMES[level]} {msg}"
+
+        self._ring[self._head] = line
+        self._head = (self._head + 1) % len(self._ring)
+        if self._count < len(self._ring):
+            self._count += 1
+
+        if self.console:
+            print(line)
+        for sink in self.sinks:
+            try:
+                sink(line)
+            except Exception:
+                pass
+
+    def tail(self, n=None):
+        """Return up to the last n lines, oldest first"""
+        if n is None or n > self._count:
+            n = self._count
+        size = len(self._ring)
+        start = (self._head - n) % size
+        return [self._ring[(start + i) % size] for i in range(n)]
+
+
+# Shared logger instance
+log = Logger()
@@ -5,11 +5,37 @@ import controller
 import gui
 import model
 import touch
+import display
 import _thread
 from webserver import start_web_server  # 👈 New module
+from telemetry import TelemetrySender
+from memory import MemoryManager
+
+# UDP telemetry to a fleet collector (host/collector.py); None disables it.
+# Use the collector's IP for unicast or a group such as "239.1.2.3".
+TELEMETRY_HOST = None
+TELEMETRY_ID = 1
+TELEMETRY_BATCH = 5
+
+# Shared secret for over-the-air updates (host/ota_upload.py --token);
+# None refuses all updates
+OTA_TOKEN = None
+
+# Display draw buffers: lines per buffer, double buffering, and internal RAM
+# (faster, DMA capable) or PSRAM.  See bench/display_bench.py for trade-offs.
+DISPLAY_BUF_LINES = 48
+DISPLAY_DOUBLE_BUFFER = True
+DISPLAY_BUF_INTERNAL = True
+
+# Keep a copy of every logged line (at the logger's level) on flash (optional)
+# from logger import log, FileSink
+# log.add_sink(FileSink("log.txt"))
 
 # Initialize LVGL
 lv.init()
+brew_display = display.Display(display.open_panel(), buf_lines=DISPLAY_BUF_LINES,
+                               double=DISPLAY_DOUBLE_BUFFER,
+                               internal=DISPLAY_BUF_INTERNAL)
 
 # Connect to Wi-Fi
 sta_if = network.WLAN(network.STA_IF)
@@ -24,23 +50,29 @@ ip = sta_if.ifconfig()[0]
 print(f"✅ Connected to Wi-Fi. IP address: {ip}")
 
 # Initialize model and GUI
-brew_model = model.BrewModel()
-gui.init_gui(brew_model)
+brew_model = model.BrewingModel()
+brew_gui = gui.BrewingGUI(brew_model)
 
 # Start touch input (GT911)
 touch.init_touch()
 
-# Start control loop
-_thread.start_new_thread(controller.run_loop, (brew_model,))
+# Start control loop (timer driven; trips to the error screen on sensor faults)
+telemetry = None
+if TELEMETRY_HOST:
+    telemetry = TelemetrySender(TELEMETRY_HOST, controller_id=TELEMETRY_ID,
+                                batch=TELEMETRY_BATCH)
+memory = MemoryManager()
+brew_controller = controller.BrewingController(brew_model, brew_gui, telemetry, memory)
 
 # Start web server for PID tuning and actuator control
-_thread.start_new_thread(start_web_server, (brew_model,))
+_thread.start_new_thread(start_web_server, (brew_model, OTA_TOKEN))
+
+# Show splash screen (optional), then back to the main screen
+gui.show_splash_screen(next_screen=brew_gui.scr)
 
-# Show splash screen (optional)
-gui.show_splash_screen()
+# Long-lived buffers (display, history, web, telemetry) exist now: compact
+# the heap and leave garbage collection to the idle slots after control ticks
+memory.start()
 
-# Main loop for LVGL tick and task handling
-while True:
-    time.sleep(0.05)
-    lv.tick_inc(50)
-    lv.task_handler()
+# Main loop for LVGL tick and task handling, paced by LVGL's own timers
+brew_display.run(idle=memory.idle)
@@ -0,0 +1,147 @@
+# memory.py - Heap management: scheduled garbage collection and heap reports
+#
+# MicroPython's collector stops everything while it runs.  Left alone it
+# fires whenever an allocation fails, which can be in the middle of a control
+# tick or a touch read.  Instead, the long-lived buffers are allocated at
+# boot, collections are run from the LVGL loop in the idle time just after a
+# control tick, and gc.threshold only acts as a safety net.
+
+import gc
+import time
+import micropython
+from logger import log
+
+
+class MemoryManager:
+    """
+    Runs gc.collect() in idle slots and reports, per interval, the allocation
+    rate, free heap, largest free block, GC pauses and the slowest control
+    tick.
+    """
+
+    def __init__(self, collect_bytes=16384, idle_window_ms=300,
+                 report_interval_ms=60000):
+        """
+        :param collect_bytes: Collect once this much has been allocated
+                              since the last collection
+        :param idle_window_ms: How long after a control tick counts as idle
+        :param report_interval_ms: Time between heap reports
+        """
+        self.collect_bytes = collect_bytes
+        self.idle_window_ms = idle_window_ms
+        self.report_interval_ms = report_interval_ms
+
+        self._tick_end = None
+        self._collected_tick = -1
+        self._ticks = 0
+        self._report_start = time.ticks_ms()
+        self._alloc_base = 0
+        self._allocated = 0
+        self.stats = {'alloc_rate': 0, 'free': 0, 'largest_block': 0,
+                      'gc_count': 0, 'gc_max_us': 0, 'gc_total_us': 0,
+                      'tick_max_us': 0}
+        self._gc_count = 0
+        self._gc_max_us = 0
+        self._gc_total_us = 0
+        self._tick_max_us = 0
+
+    def start(self, threshold=None):
+        """
+        Call once the long-lived objects (display buffers, history, web and
+        telemetry buffers) exist, so they sit at the bottom of a compact heap.
+
+        :param threshold: Bytes allocated between safety-net collections;
+                          default a quarter of the free heap
+        """
+        micropython.alloc_emergency_exception_buf(128)
+        gc.collect()
+        if threshold is None:
+            threshold = gc.mem_free() // 4
+        threshold = max(threshold, 2 * self.collect_bytes)
+        # Collections are normally run from idle(); this only catches a
+        # burst of allocation that would otherwise exhaust the heap
+        gc.threshold(threshold)
+        self.stats['free'] = gc.mem_free()
+        self.stats['largest_block'] = largest_free_block()
+        self._alloc_base = gc.mem_alloc()
+        log.info("💾 Heap after boot: %d free, largest block %d, GC threshold %d",
+                 self.stats['free'], self.stats['largest_block'], threshold)
+
+    def tick_done(self, elapsed_us):
+        """Record the end of a control tick and how long it took"""
+        self._tick_end = time.ticks_ms()
+        self._ticks += 1
+        if elapsed_us > self._tick_max_us:
+            self._tick_max_us = elapsed_us
+
+    def idle(self):
+        """
+        Call from the LVGL loop before it sleeps.  Collects if enough has
+        been allocated and a control tick finished recently (so the next one
+        is far away), at most once per tick, and reports when due.
+        """
+        now = time.ticks_ms()
+        if self._tick_end is None or self._collected_tick == self._ticks or \
+                time.ticks_diff(now, self._tick_end) >= self.idle_window_ms:
+            return
+        report_due = time.ticks_diff(now, self._report_start) >= self.report_interval_ms
+        used = gc.mem_alloc()
+        if report_due or used - self._alloc_base >= self.collect_bytes:
+            self._collect(used)
+            self._collected_tick = self._ticks
+            if report_due:
+                self._report(now)
+
+    def _collect(self, used):
+        start = time.ticks_us()
+        gc.collect()
+        pause = time.ticks_diff(time.ticks_us(), start)
+        self._allocated += used - self._alloc_base
+        self._alloc_base = gc.mem_alloc()
+        self._gc_count += 1
+        self._gc_total_us += pause
+        if pause > self._gc_max_us:
+            self._gc_max_us = pause
+
+    def _report(self, now):
+        # Runs right after an idle collection, so probing the heap is cheap
+        seconds = time.ticks_diff(now, self._report_start) / 1000
+        stats = self.stats
+        stats['alloc_rate'] = int(self._allocated / seconds)
+        stats['free'] = gc.mem_free()
+        stats['largest_block'] = largest_free_block()
+        stats['gc_count'] = self._gc_count
+        stats['gc_max_us'] = self._gc_max_us
+        stats['gc_total_us'] = self._gc_total_us
+        stats['tick_max_us'] = self._tick_max_us
+        log.info("💾 Heap: %d B/s allocated, %d free, largest block %d, "
+                 "GC %d x max %d us, slowest tick %d us",
+                 stats['alloc_rate'], stats['free'], stats['largest_block'],
+                 self._gc_count, self._gc_max_us, self._tick_max_us)
+        self._report_start = now
+        self._alloc_base = gc.mem_alloc()  # leave out the probe's garbage
+        self._allocated = 0
+        self._gc_count = 0
+        self._gc_max_us = 0
+        self._gc_total_us = 0
+        self._tick_max_us = 0
+
+
+def largest_free_block(limit=65536, granularity=512):
+    """
+    Size of the largest contiguous allocation that currently succeeds, up to
+    `limit`, found by bisection.  A measure of fragmentation; call it right
+    after a collection, since failed attempts trigger one.  The limit keeps
+    the probe short on a large PSRAM heap.
+    """
+    lo = 0
+    hi = min(gc.mem_free(), limit + granularity)
+    while hi - lo > granularity:
+        mid = (lo + hi) // 2
+        try:
+            block = bytearray(mid)
+            del block
+            lo = mid
+        except MemoryError:
+            hi = mid
+    return lo
@@ -1,49 +1,252 @@
 from thermistor import ThermistorReader
 from simple_pid import PID
-from machine import Pin, PWM
+from estimator import KettleEstimator
+from health import SensorHealthMonitor
+from heater import HeaterOutput, MODE_BURST
+from smith import SmithPredictor
+from history import HistoryBuffer
+from gains import GainSchedule, RELAY_HYSTERESIS, RELAY_MAX_SETPOINT, relay_tuning
+from logger import log
+from machine import Pin
+import os
+import time
+import ujson
+import _thread
 
 class BrewingModel:
     def __init__(self):
         self.sensor = ThermistorReader(adc_pin=1)
-        self.temperature = self.sensor.read_temperature()
+        try:
+            self.temperature = self.sensor.read_temperature()
+        except Exception:
+            # Probe open or shorted; the first control tick latches the fault
+            self.temperature = 0.0
         self.setpoint = 65.0
 
+        # Filtered temperature and rate of rise for the PID and GUI
+        self.estimator = KettleEstimator(alpha=0.5, beta=0.1)
+        self.heater_power = 0.0
+        self._last_read_ms = None
+
+        # Sensor fault classifier; a fault latches the heater off
+        self.health = SensorHealthMonitor()
+        self.fault = None
+
         self.pid = PID(2.0, 0.1, 0.05, setpoint=self.setpoint)
         self.pid.output_limits = (0, 100)
 
+        # Gains per setpoint, filled by auto-tune runs (empty: fixed gains)
+        self.gains = GainSchedule()
+        self.load_gain_schedule()
+
+        # Optional dead-time compensation: a separate, more aggressive PID
+        # wrapped in a Smith predictor (see configure_smith)
+        self.control_mode = "pid"
+        self.smith = None
+        self.load_smith_model()
+
+        # Two hours of temperature/setpoint/duty for /api/history
+        self.history = HistoryBuffer()
+
         self.pump_on = False
         self.heating_on = False
         self.heater_enabled = False
         self.stage = "Idle"
 
+        # Auto-tune progress for the GUI; None when not running
+        self.autotune_cycle = None
+        self.autotune_cycles = 0
+        self.relay_power = None
+        # Only one relay test at a time, whether started from the GUI or web
+        self._autotune_lock = _thread.allocate_lock()
+
         self.pump_pin = Pin(10, Pin.OUT)
-        self.heater_pwm = PWM(Pin(9), freq=1000)
-        self.heater_pwm.duty(0)
+        self.heater = HeaterOutput(9, mode=MODE_BURST)
 
     def update_temperature(self):
-        temp = self.sensor.read_temperature()
-        if 0.0 <= temp <= 100.0:
+        try:
+            temp = self.sensor.read_temperature()
+        except Exception as e:
+            # An open or shorted probe puts the ADC at 0 or full scale, where
+            # the conversion itself fails (division by zero, log of <= 0)
+            fault = self.health.read_failed()
+            self.estimator.reset()
+            if not self.fault:
+                log.error("⚠️ %s (%s) — disabling heating", fault, e)
+                self.trip(fault)
+            return
+        now = time.ticks_ms()
+        dt = 0.0
+        if self._last_read_ms is not None:
+            dt = time.ticks_diff(now, self._last_read_ms) / 1000.0
+        self._last_read_ms = now
+
+        fault = self.health.update(temp, dt, self.heater_power)
+        if fault:
             self.temperature = temp
+            self.estimator.reset()
+            if not self.fault:
+                log.error("⚠️ %s: %.2f°C — disabling heating", fault, temp)
+                self.trip(fault)
         else:
-            print(f"⚠️ Sensor out of range: {temp:.2f}°C — disabling heating")
-            self.temperature = temp
-            self.heating_on = False
-            self.heater_enabled = False
-            self.heater_pwm.duty(0)
+            self.temperature = self.estimator.update(temp, dt, self.heater_power)
+
+    def trip(self, fault):
+        """Latch the heater off until clear_fault() is called"""
+        self.fault = fault
+        self.heating_on = False
+        self.heater_enabled = False
+        self.heater_power = 0.0
+        self.heater.off()
+
+    def clear_fault(self):
+        """Acknowledge a sensor fault and re-arm the health monitor"""
+        self.fault = None
+        self.health.reset()
+        self.estimator.reset()
 
     def get_heater_output(self):
-        if self.heater_enabled and self.heating_on:
-            power = self.pid(self.temperature)
-            duty = int(power / 100 * 1023)
-            self.heater_pwm.duty(duty)
+        if self.heater_enabled and self.heating_on and not self.fault:
+            if self.relay_power is not None:
+                # Relay auto-tune in progress: fixed on/off power
+                power = self.relay_power
+                self.heater.set_power(power)
+                self.heater_power = power
+                return power
+            if self.control_mode == "smith":
+                controller = self.smith
+            else:
+                controller = self.pid
+                if self.gains.active:
+                    self.gains.apply(self.pid, self.setpoint)
+            power = controller(self.temperature, rate=self.estimator.rate)
+            self.heater.set_power(power)
+            self.heater_power = power
             return power
         else:
-            self.heater_pwm.duty(0)
+            self.heater.off()
+            self.heater_power = 0.0
             return 0
 
+    @property
+    def heating_rate(self):
+        """Estimated rate of rise in °C/s"""
+        return self.estimator.rate
+
+    def time_to_setpoint(self):
+        """Predicted seconds until the setpoint is reached, or None"""
+        return self.estimator.time_to_setpoint(self.setpoint)
+
     def set_target_temperature(self, temp):
         self.setpoint = temp
         self.pid.setpoint = temp
+        if self.smith:
+            self.smith.setpoint = temp
+
+    @property
+    def active_pid(self):
+        """The PID currently driving the heater (its gains are user tunable)"""
+        if self.control_mode == "smith":
+            return self.smith.pid
+        return self.pid
+
+    def configure_smith(self, gain, time_constant, dead_time, tunings=(100.0, 0.05, 0.0),
+                        save=True):
+        """
+        Set up the Smith predictor from a first-order-plus-dead-time model,
+        either measured (smith.identify_step on a heat-up log) or configured,
+        and save it to smith.json (unless save is False, when loading it).
+        """
+        if self.smith:
+            self.smith.configure(gain, time_constant, dead_time)
+            self.smith.pid.tunings = tunings
+        else:
+            pid = PID(tunings[0], tunings[1], tunings[2], setpoint=self.setpoint)
+            pid.output_limits = (0, 100)
+            self.smith = SmithPredictor(pid, gain, time_constant, dead_time)
+        if save:
+            self.save_smith_model()
+
+    def set_control_mode(self, mode):
+        """Select "pid" or "smith" (needs a configured model)"""
+        if mode not in ("pid", "smith"):
+            raise ValueError(f"Unknown control mode: {mode}")
+        if mode == "smith" and not self.smith:
+            raise ValueError("Smith predictor model not configured")
+        if mode != self.control_mode:
+            self.pid.reset()
+            if self.smith:
+                self.smith.reset()
+        self.control_mode = mode
+        self.save_smith_model()
+
+    def load_smith_model(self):
+        try:
+            with open("smith.json", "r") as f:
+                data = ujson.load(f)
+        except:
+            return
+        # Loading must not rewrite the file, whose mode isn't applied yet
+        self.configure_smith(data["gain"], data["time_constant"], data["dead_time"],
+                             tuple(data.get("tunings", (100.0, 0.05, 0.0))), save=False)
+        self.control_mode = data.get("mode", "pid")
+
+    def save_smith_model(self):
+        if not self.smith:
+            return
+        with open("smith.json", "w") as f:
+            ujson.dump({
+                "gain": self.smith.gain,
+                "time_constant": self.smith.time_constant,
+                "dead_time": self.smith.dead_time,
+                "tunings": self.smith.pid.tunings,
+                "mode": self.control_mode,
+            }, f)
+
+    def load_gain_schedule(self):
+        try:
+            with open("gains.json", "r") as f:
+                data = ujson.load(f)
+        except:
+            return
+        for temp, kp, ki, kd in data:
+            self.gains.entries[float(temp)] = (kp, ki, kd)
+        self.gains.rebuild()
+        log.info("Gain schedule: %d entries loaded", len(self.gains.entries))
+
+    def save_gain_schedule(self):
+        with open("gains.json", "w") as f:
+            ujson.dump([[t, g[0], g[1], g[2]] for t, g in sorted(self.gains.entries.items())], f)
+
+    def clear_gain_schedule(self):
+        """Drop all scheduled gains; the PID keeps its current gains"""
+        self.gains.entries.clear()
+        self.gains.rebuild()
+        try:
+            os.remove("gains.json")
+        except OSError:
+            pass
+        log.info("Gain schedule cleared")
+
+    def set_pid_gains(self, kp=None, ki=None, kd=None):
+        """
+        Manually set gains of the PID driving the heater.  Smith mode gains
+        are saved with the model in smith.json; while a gain schedule is in
+        use, plain PID gains are stored as the entry for the current
+        setpoint, so the schedule doesn't replace them at the next change.
+        """
+        pid = self.active_pid
+        if kp is not None:
+            pid.kp = kp
+        if ki is not None:
+            pid.ki = ki
+        if kd is not None:
+            pid.kd = kd
+        if self.control_mode == "smith":
+            self.save_smith_model()
+        elif self.gains.active:
+            self.gains.set_entry(self.setpoint, pid.kp, pid.ki, pid.kd)
+            self.save_gain_schedule()
 
     def set_calibration_offset(self, offset):
         self.sensor.save_calibration(offset)
@@ -54,68 +257,112 @@ class BrewingModel:
         self.pump_pin.value(1 if self.pump_on else 0)
 
     def toggle_heater_enabled(self):
+        if self.fault and not self.heater_enabled:
+            return
         self.heater_enabled = not self.heater_enabled
         if not self.heater_enabled:
             self.heating_on = False
-            self.heater_pwm.duty(0)
+            self.heater.off()
 
     def toggle_heating(self):
         self.heating_on = not self.heating_on
         if not self.heating_on:
-            self.heater_pwm.duty(0)
+            self.heater.off()
 
     def start_brewing(self):
         self.stage = "Heating"
 
-    def auto_tune_pid(self, relay_amplitude=10.0, n_cycles=5):
+    def auto_tune_pid(self, hysteresis=RELAY_HYSTERESIS, n_cycles=5,
+                      timeout_s=7200):
         """
-        Simple relay-based PID auto-tune. Applies relay to heater and analyzes oscillation.
-        relay_amplitude: temperature deviation to trigger relay
-        n_cycles: number of oscillation cycles to observe
+        Relay auto-tune around the current setpoint.  The heater runs at full
+        power up to the setpoint, then is switched off above setpoint +
+        hysteresis and fully on below setpoint - hysteresis; Ziegler-Nichols
+        gains come from the resulting oscillation (gains.relay_tuning, which
+        simulator.relay_tune uses as well).  Blocks until done; turning the
+        heater off aborts it.
+
+        :param hysteresis: Switching band either side of the setpoint (°C)
+        :param n_cycles: Oscillation cycles to observe
+        :param timeout_s: Abort if heat-up and cycles take longer than this
+        :return: (kp, ki, kd), or None if the run was refused or aborted
         """
-        import time
-        print("Starting PID auto-tune...")
-        original_setpoint = self.setpoint
-        self.setpoint = self.temperature + relay_amplitude
+        if self.setpoint > RELAY_MAX_SETPOINT:
+            log.warning("⚠️ Auto-tune needs a setpoint of at most %.0f°C",
+                        RELAY_MAX_SETPOINT)
+            return None
+        if not self._autotune_lock.acquire(0):
+            log.warning("⚠️ Auto-tune already running")
+            return None
+        try:
+            return self._auto_tune(hysteresis, n_cycles, timeout_s)
+        finally:
+            self._autotune_lock.release()
+
+    def _autotune_wait(self, deadline):
+        """Sleep one poll interval; return why the run must stop, or None"""
+        time.sleep(0.5)
+        if self.fault:
+            return self.fault
+        if not (self.heater_enabled and self.heating_on):
+            return "heater turned off"
+        if time.ticks_diff(deadline, time.ticks_ms()) <= 0:
+            return "timed out"
+        return None
+
+    def _auto_tune(self, hysteresis, n_cycles, timeout_s):
+        log.info("Starting PID auto-tune...")
+        self.autotune_cycles = n_cycles
+        self.autotune_cycle = 0
+        setpoint = self.setpoint
+        deadline = time.ticks_add(time.ticks_ms(), int(timeout_s * 1000))
         self.heater_enabled = True
         self.heating_on = True
-        relay_high = True
-        t_high = []
-        t_low = []
-        last_switch_time = time.ticks_ms()
-        cycle_count = 0
-        temp_history = []
-        while cycle_count < n_cycles:
-            temp = self.sensor.read_temperature()
-            temp_history.append(temp)
-            if relay_high and temp >= original_setpoint + relay_amplitude:
-                self.heating_on = False
-                relay_high = False
-                t_high.append(time.ticks_diff(time.ticks_ms(), last_switch_time)/1000.0)
-                last_switch_time = time.ticks_ms()
-                cycle_count += 1
-                print(f"Relay LOW, cycle {cycle_count}")
-            elif not relay_high and temp <= original_setpoint - relay_amplitude:
-                self.heating_on = True
-                relay_high = True
-                t_low.append(time.ticks_diff(time.ticks_ms(), last_switch_time)/1000.0)
-                last_switch_time = time.ticks_ms()
-                print(f"Relay HIGH, cycle {cycle_count}")
-            time.sleep(0.5)
-        # Calculate period and amplitude
-        avg_period = (sum(t_high) + sum(t_low)) / n_cycles
-        amplitude = relay_amplitude
-        Ku = (4.0 * amplitude) / (3.1415 * (max(temp_history) - min(temp_history)))
-        Tu = avg_period
-        # Ziegler-Nichols tuning
-        kp = 0.6 * Ku
-        ki = 1.2 * Ku / Tu
-        kd = 0.075 * Ku * Tu
+        switches = []
+        peaks = []
+        try:
+            # get_heater_output applies the relay power while this is set
+            self.relay_power = 100.0
+            while self.temperature < setpoint:
+                stop = self._autotune_wait(deadline)
+                if stop:
+                    log.warning("⚠️ Auto-tune aborted: %s", stop)
+                    return None
+            self.relay_power = 0.0
+            start = time.ticks_ms()
+            switches.append(0.0)
+            extreme = self.temperature
+            while len(switches) < 2 * n_cycles + 1:
+                stop = self._autotune_wait(deadline)
+                if stop:
+                    log.warning("⚠️ Auto-tune aborted: %s", stop)
+                    return None
+                temp = self.temperature
+                if self.relay_power:
+                    extreme = min(extreme, temp)
+                    switch = temp >= setpoint + hysteresis
+                else:
+                    extreme = max(extreme, temp)
+                    switch = temp <= setpoint - hysteresis
+                if switch:
+                    peaks.append(extreme)
+                    switches.append(time.ticks_diff(time.ticks_ms(), start) / 1000.0)
+                    self.relay_power = 100.0 - self.relay_power
+                    extreme = temp
+                    self.autotune_cycle = len(peaks) // 2
+                    log.info("Relay %s, cycle %d", "HIGH" if self.relay_power else "LOW",
+                             self.autotune_cycle)
+        finally:
+            self.relay_power = None
+            self.heater_enabled = False
+            self.heating_on = False
+            self.autotune_cycle = None
+        kp, ki, kd = relay_tuning(switches, peaks)
         self.pid.kp = kp
         self.pid.ki = ki
         self.pid.kd = kd
-        self.setpoint = original_setpoint
-        self.heater_enabled = False
-        self.heating_on = False
-        print(f"Auto-tune complete. New PID: Kp={kp:.2f}, Ki={ki:.2f}, Kd={kd:.2f}")
+        # Each run fills the gain schedule at the setpoint it was tuned around
+        self.gains.set_entry(setpoint, kp, ki, kd)
+        self.save_gain_schedule()
+        log.info("Auto-tune complete. New PID: Kp=%.2f, Ki=%.2f, Kd=%.2f", kp, ki, kd)
         return kp, ki, kd
\ No newline at end of file
@@ -0,0 +1,261 @@
+# ota.py - Streaming over-the-air update with hash verification and rollback
+#
+# Update flow (driven over HTTP by webserver.py, or host/ota_upload.py):
+#   1. begin(manifest)      manifest = {"version": ..., "files": {path: sha256}}
+#   2. receive_file(...)    once per file, streamed to STAGE_DIR in chunks
+#   3. commit()             marks the staged update pending; then reset
+#   4. boot()               from boot.py (never main.py) swaps the staged
+#                           files in, or rolls back if the previous boot
+#                           never reached its first control tick
+#   5. mark_good()          after the first control tick
+#
+# The trial boot runs under the hardware watchdog: if the new code raises
+# (MicroPython then sits in the REPL) or hangs before its first control tick,
+# the watchdog resets the board and boot() rolls back.
+
+import os
+import time
+import hashlib
+import binascii
+import ujson
+import machine
+from logger import log
+
+STAGE_DIR = 'ota_stage'
+BACKUP_DIR = 'ota_backup'
+STATE_FILE = 'ota_state.json'
+MANIFEST_FILE = STAGE_DIR + '/manifest.json'
+CHUNK_SIZE = 1024
+# Time the trial boot has to reach its first control tick (Wi-Fi included)
+TRIAL_TIMEOUT_MS = 120000
+# The update and rollback code itself: a bad copy of any of these would stop
+# boot() from running, leaving USB as the only way back
+PROTECTED = ('boot.py', 'ota.py', 'logger.py')
+
+_buf = bytearray(CHUNK_SIZE)
+_buf_mv = memoryview(_buf)
+_wdt = None
+
+
+def _exists(path):
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+
+def _makedirs(path):
+    """Create every directory leading up to a file path"""
+    parts = path.split('/')[:-1]
+    current = ''
+    for part in parts:
+        current = current + '/' + part if current else part
+        if not _exists(current):
+            os.mkdir(current)
+
+
+def _remove_tree(path):
+    if not _exists(path):
+        return
+    if os.stat(path)[0] & 0x4000:  # directory
+        for name in os.listdir(path):
+            _remove_tree(path + '/' + name)
+        os.rmdir(path)
+    else:
+        os.remove(path)
+
+
+def _load_json(path, default):
+    try:
+        with open(path) as f:
+            return ujson.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _save_json(path, data):
+    # Write then rename so a power cut never leaves a half-written file
+    with open(path + '.tmp', 'w') as f:
+        ujson.dump(data, f)
+    os.rename(path + '.tmp', path)
+
+
+def _check_path(path):
+    if not path or path.startswith('/') or '..' in path.split('/') or \
+            path.startswith(STAGE_DIR) or path.startswith(BACKUP_DIR) or \
+            path == STATE_FILE:
+        raise ValueError(f"Invalid update path: {path}")
+    if path in PROTECTED:
+        raise ValueError(f"{path} can only be updated over USB")
+
+
+def begin(manifest):
+    """
+    Start a new update, discarding anything staged before.
+
+    :param manifest: {"version": str, "files": {path: sha256 hex}}
+    """
+    files = manifest.get('files')
+    if not files:
+        raise ValueError("Manifest lists no files")
+    for path in files:
+        _check_path(path)
+    _remove_tree(STAGE_DIR)
+    os.mkdir(STAGE_DIR)
+    _save_json(MANIFEST_FILE, manifest)
+    log.info("OTA: started update %s (%d files)", manifest.get('version'), len(files))
+
+
+def receive_file(path, stream, length, initial=b''):
+    """
+    Stream one file of the update to the staging area without holding it in
+    RAM, checking its SHA-256 against the manifest.
+
+    :param path: Destination path, as listed in the manifest
+    :param stream: Socket (or file) the remaining bytes are read from
+    :param length: Total file size in bytes
+    :param initial: Bytes of the file already read with the request headers
+    :return: (bytes written, elapsed ms)
+    """
+    manifest = _load_json(MANIFEST_FILE, None)
+    if manifest is None:
+        raise ValueError("No update in progress")
+    expected = manifest['files'].get(path)
+    if expected is None:
+        raise ValueError(f"{path} is not in the manifest")
+
+    readinto = getattr(stream, 'readinto', None) or stream.recv_into
+    staged = STAGE_DIR + '/' + path
+    _makedirs(staged)
+    start = time.ticks_ms()
+    h = hashlib.sha256()
+    received = 0
+    try:
+        with open(staged + '.part', 'wb') as f:
+            if initial:
+                initial = initial[:length]
+                h.update(initial)
+                f.write(initial)
+                received = len(initial)
+            while received < length:
+                n = readinto(_buf_mv[:min(CHUNK_SIZE, length - received)])
+                if not n:
+                    break
+                chunk = _buf_mv[:n]
+                h.update(chunk)
+                f.write(chunk)
+                received += n
+    except OSError as e:
+        # Socket timeout or reset, or flash full: don't leave the part behind
+        if _exists(staged + '.part'):
+            os.remove(staged + '.part')
+        raise ValueError(f"{path}: transfer failed after {received} bytes ({e})")
+
+    digest = binascii.hexlify(h.digest()).decode()
+    if received != length or digest != expected.lower():
+        os.remove(staged + '.part')
+        raise ValueError(f"{path}: got {received}/{length} bytes, sha256 {digest}")
+
+    if _exists(staged):
+        os.remove(staged)
+    os.rename(staged + '.part', staged)
+    elapsed = time.ticks_diff(time.ticks_ms(), start)
+    log.info("OTA: %s %d bytes in %d ms (%.1f KB/s)", path, received, elapsed,
+             received / 1.024 / max(elapsed, 1))
+    return received, elapsed
+
+
+def commit():
+    """Check every manifest file is staged and mark the update for next boot"""
+    manifest = _load_json(MANIFEST_FILE, None)
+    if manifest is None:
+        raise ValueError("No update in progress")
+    missing = [p for p in manifest['files'] if not _exists(STAGE_DIR + '/' + p)]
+    if missing:
+        raise ValueError(f"Files not uploaded: {', '.join(missing)}")
+    _save_json(STATE_FILE, {'pending': True, 'files': list(manifest['files'])})
+    log.info("OTA: update %s staged, applying on reboot", manifest.get('version'))
+
+
+def _swap(files):
+    """Move staged files into place, keeping the old ones; safe to re-run"""
+    for path in files:
+        staged = STAGE_DIR + '/' + path
+        backup = BACKUP_DIR + '/' + path
+        if not _exists(staged):
+            continue  # already moved by an interrupted earlier swap
+        if _exists(path):
+            if not _exists(backup):
+                _makedirs(backup)
+                os.rename(path, backup)
+            else:
+                os.remove(path)
+        _makedirs(path)
+        os.rename(staged, path)
+
+
+def _rollback(files, new):
+    """Restore the backed-up files and remove files the update added"""
+    for path in files:
+        backup = BACKUP_DIR + '/' + path
+        if _exists(backup):
+            if _exists(path):
+                os.remove(path)
+            os.rename(backup, path)
+        elif path in new and _exists(path):
+            os.remove(path)
+
+
+def boot():
+    """
+    Called from boot.py, which runs before main.py on every reset, so a
+    broken main.py can't prevent it; main.py must not call it.  Applies a pending update or rolls back a trial that failed: if the board
+    is reset before mark_good() runs, the next boot restores the old files.
+    After applying an update the watchdog is armed, so that reset happens
+    even when the new code never gets to call feed().
+    """
+    state = _load_json(STATE_FILE, None)
+    if not state:
+        return
+    files = state.get('files', [])
+
+    if state.get('trial'):
+        log.error("OTA: update never reached its first control tick, rolling back")
+        _rollback(files, state.get('new', []))
+        _remove_tree(BACKUP_DIR)
+        _remove_tree(STAGE_DIR)
+        os.remove(STATE_FILE)
+        return
+
+    if state.get('pending'):
+        if 'new' not in state:
+            # Record which files the update adds before anything is moved,
+            # so an interrupted swap can be resumed and still rolled back
+            state['new'] = [p for p in files if not _exists(p)]
+            _save_json(STATE_FILE, state)
+        _swap(files)
+        _save_json(STATE_FILE, {'trial': True, 'files': files, 'new': state['new']})
+        _remove_tree(STAGE_DIR)
+        global _wdt
+        _wdt = machine.WDT(timeout=TRIAL_TIMEOUT_MS)
+        log.info("OTA: update applied, waiting for first control tick")
+
+
+def feed():
+    """
+    Call every control tick.  The ESP32's watchdog can't be stopped once a
+    trial boot armed it, so it is fed from then on (and still resets a
+    controller whose control loop stops).
+    """
+    if _wdt is not None:
+        _wdt.feed()
+
+
+def mark_good():
+    """Call once the application reached its first control tick"""
+    state = _load_json(STATE_FILE, None)
+    if state and state.get('trial'):
+        _remove_tree(BACKUP_DIR)
+        os.remove(STATE_FILE)
+        log.info("OTA: update confirmed")
@@ -33,15 +33,22 @@ class PID:
         self._integral = 0.0
         self._last_output = 0.0
         
+        # Last individual terms, for telemetry
+        self.p_term = 0.0
+        self.i_term = 0.0
+        self.d_term = 0.0
+        
         # Reset the PID
         self.reset()
     
-    def __call__(self, input_val, dt=None):
+    def __call__(self, input_val, dt=None, rate=None):
         """
         Calculate PID output
         
         :param input_val: Current process variable (temperature)
         :param dt: Time delta in seconds (optional, will calculate if None)
+        :param rate: Estimated rate of change of the input per second
+                     (optional, differenced from the last input if None)
         :return: PID output
         """
         if not self._auto_mode:
@@ -68,30 +75,38 @@ class PID:
         # Proportional term
         proportional = self.kp * error
         
-        # Integral term
-        self._integral += error * dt
+        # Integral term (each float operation allocates on MicroPython, so
+        # intermediate results are computed once and reused)
+        step = error * dt
+        self._integral += step
         integral = self.ki * self._integral
         
         # Derivative term  
         derivative = 0.0
-        if self._last_input is not None:
+        if rate is not None:
+            derivative = self.kd * rate
+        elif self._last_input is not None:
             derivative = self.kd * (input_val - self._last_input) / dt
         
         # Calculate output
         output = proportional + integral - derivative  # Note: derivative is subtracted
         
-        # Apply output limits
-        if self._output_limits[0] is not None and output < self._output_limits[0]:
-            output = self._output_limits[0]
-        elif self._output_limits[1] is not None and output > self._output_limits[1]:
-            output = self._output_limits[1]
-            
-        # Anti-windup: reset integral if output is saturated
-        if (self._output_limits[0] is not None and output <= self._output_limits[0]) or \
-           (self._output_limits[1] is not None and output >= self._output_limits[1]):
-            self._integral -= error * dt  # Remove the contribution that caused saturation
+        # Apply output limits, with anti-windup: when the output is
+        # saturated, remove the contribution that caused it
+        low, high = self._output_limits
+        if low is not None and output <= low:
+            output = low
+            self._integral -= step
+            integral = self.ki * self._integral
+        elif high is not None and output >= high:
+            output = high
+            self._integral -= step
+            integral = self.ki * self._integral
         
         # Store values for next iteration
+        self.p_term = proportional
+        self.i_term = integral
+        self.d_term = -derivative
         self._last_input = input_val
         self._last_output = output
         
@@ -130,6 +145,15 @@ class PID:
         else:
             self._output_limits = (limits[0], limits[1])
     
+    def set_tunings_bumpless(self, kp, ki, kd):
+        """
+        Change gains without a step in the output from the integral term:
+        the accumulated integral is rescaled so ki * integral is unchanged
+        """
+        if ki and self.ki:
+            self._integral *= self.ki / ki
+        self.kp, self.ki, self.kd = kp, ki, kd
+    
     @property 
     def tunings(self):
         """Get PID tunings"""
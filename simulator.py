@@ -0,0 +1,377 @@
+# simulator.py - Host-side kettle thermal simulator and fault replay
+#
+# Runs on CPython (or MicroPython) without any hardware.  Used to check the
+# control and safety code against a plant before it goes near a real element:
+#
+#     python simulator.py health
+#     python simulator.py smith
+#     python simulator.py schedule
+
+import random
+import sys
+import time
+
+if not hasattr(time, 'ticks_ms'):
+    # MicroPython time functions used by the controller code, for CPython
+    time.ticks_ms = lambda: int(time.monotonic() * 1000)
+    time.ticks_diff = lambda a, b: a - b
+
+from estimator import KettleEstimator
+from health import SensorHealthMonitor
+from simple_pid import PID
+from smith import SmithPredictor, identify_step
+from gains import GainSchedule, RELAY_HYSTERESIS, relay_tuning
+
+
+class KettleSimulator:
+    """
+    Lumped thermal model of a Digiboil kettle: a heating element with its own
+    thermal lag, a mass of water losing heat to ambient, and a thermistor that
+    sees the water through a transport delay plus measurement noise.
+    """
+
+    def __init__(self, volume_l=25.0, power_w=2400.0, ambient=20.0,
+                 loss_w_per_c=6.0, element_tau=60.0, dead_time=20.0,
+                 noise=0.05, boil=99.5, start_temp=None, seed=0):
+        self.capacity = volume_l * 4186.0  # J/°C
+        self.power_w = power_w
+        self.ambient = ambient
+        self.loss = loss_w_per_c
+        self.element_tau = element_tau
+        self.noise = noise
+        self.boil = boil
+        self.rng = random.Random(seed)
+
+        self.water = ambient if start_temp is None else start_temp
+        self.element = 0.0  # heat currently delivered, W
+        self.time = 0.0
+
+        self._delay = [self.water] * max(1, int(dead_time))
+        self._delay_idx = 0
+
+        self.fault = None
+        self.fault_at = None
+        self._stuck_value = None
+        self._probe = None
+
+    def inject_fault(self, kind, at):
+        """
+        Schedule a sensor fault.
+
+        :param kind: 'stuck', 'intermittent', 'bench', 'noisy', 'open' or
+                     'short'
+        :param at: Simulation time (s) at which the fault starts
+        """
+        self.fault = kind
+        self.fault_at = at
+
+    def step(self, power, dt=1.0):
+        """
+        Advance the plant by dt seconds with the given heater power (0-100)
+        and return the thermistor reading.
+        """
+        target = self.power_w * power / 100.0
+        self.element += (target - self.element) * min(1.0, dt / self.element_tau)
+        loss = self.loss * (self.water - self.ambient)
+        self.water += (self.element - loss) * dt / self.capacity
+        if self.water > self.boil:
+            self.water = self.boil
+        self.time += dt
+
+        # Transport delay between the water at the element and the probe
+        delayed = self._delay[self._delay_idx]
+        self._delay[self._delay_idx] = self.water
+        self._delay_idx = (self._delay_idx + 1) % len(self._delay)
+
+        reading = delayed + self.rng.gauss(0.0, self.noise)
+        return self._apply_fault(reading, dt)
+
+    def _apply_fault(self, reading, dt):
+        if self.fault is None or self.time < self.fault_at:
+            self._probe = reading
+            return reading
+
+        if self.fault == 'stuck':
+            if self._stuck_value is None:
+                self._stuck_value = self._probe
+            return self._stuck_value
+        if self.fault == 'intermittent':
+            if self.rng.random() < 0.1:
+                return reading - self.rng.uniform(5.0, 30.0)
+            return reading
+        if self.fault == 'bench':
+            # Probe lying on the bench: drifts to ambient, ignores the water
+            self._probe += (self.ambient - self._probe) * min(1.0, dt / 60.0)
+            return self._probe + self.rng.gauss(0.0, self.noise)
+        if self.fault == 'noisy':
+            return reading + self.rng.gauss(0.0, 1.5)
+        # Probe disconnected or shorted: the ADC reads 0 or full scale and
+        # ThermistorReader.read_temperature fails as it does on the device
+        if self.fault == 'open':
+            raise ZeroDivisionError("float division by zero")
+        if self.fault == 'short':
+            raise ValueError("math domain error")
+        return reading
+
+
+# Mash-in, hold, mash-out and boil, as (setpoint °C, seconds after reaching it)
+BREW_SCHEDULE = ((66.0, 3600.0), (76.0, 600.0), (100.0, 3600.0))
+
+
+def run_brew(sim, monitor=None, schedule=BREW_SCHEDULE, dt=1.0,
+             max_time=6 * 3600.0):
+    """
+    Drive the simulator through a brew schedule with the same estimator and
+    PID configuration as BrewingModel.
+
+    :return: (tripped fault or None, time of trip or None)
+    """
+    estimator = KettleEstimator(alpha=0.5, beta=0.1)
+    pid = PID(2.0, 0.1, 0.05, setpoint=schedule[0][0])
+    pid.output_limits = (0, 100)
+    power = 0.0
+    stage = 0
+    reached_at = None
+
+    while sim.time < max_time and stage < len(schedule):
+        setpoint, hold = schedule[stage]
+        pid.setpoint = setpoint
+        try:
+            reading = sim.step(power, dt)
+        except (ArithmeticError, ValueError):
+            if monitor is None:
+                raise
+            # As BrewingModel.update_temperature: a failed read latches
+            return monitor.read_failed(), sim.time
+
+        if monitor is not None:
+            fault = monitor.update(reading, dt, power)
+            if fault:
+                return fault, sim.time
+
+        temp = estimator.update(reading, dt, power)
+        power = pid(temp, dt=dt, rate=estimator.rate)
+
+        if reached_at is None and temp >= min(setpoint, sim.boil) - 0.5:
+            reached_at = sim.time
+        if reached_at is not None and sim.time - reached_at >= hold:
+            stage += 1
+            reached_at = None
+
+    return None, None
+
+
+def evaluate_health(seeds=20):
+    """
+    Measure detection latency per fault type and the false-positive rate of
+    SensorHealthMonitor on healthy brews.
+    """
+    print("Fault detection latency (s):")
+    for kind in ('stuck', 'intermittent', 'bench', 'noisy', 'open', 'short'):
+        latencies = []
+        missed = 0
+        for seed in range(seeds):
+            rng = random.Random(seed)
+            sim = KettleSimulator(seed=seed)
+            fault_at = rng.uniform(300.0, 3000.0)
+            sim.inject_fault(kind, fault_at)
+            fault, at = run_brew(sim, SensorHealthMonitor())
+            if fault is None or at < fault_at:
+                missed += 1
+            else:
+                latencies.append(at - fault_at)
+        if latencies:
+            latencies.sort()
+            print(f"  {kind:<13} median {latencies[len(latencies) // 2]:7.1f}"
+                  f"  worst {latencies[-1]:7.1f}  missed {missed}/{seeds}")
+        else:
+            print(f"  {kind:<13} missed {missed}/{seeds}")
+
+    trips = 0
+    hours = 0.0
+    for seed in range(seeds):
+        sim = KettleSimulator(seed=1000 + seed)
+        fault, _ = run_brew(sim, SensorHealthMonitor())
+        hours += sim.time / 3600.0
+        if fault:
+            trips += 1
+            print(f"  false positive (seed {1000 + seed}): {fault}")
+    print(f"False positives: {trips} in {hours:.1f} simulated hours")
+
+
+def run_step(sim, controller, setpoint, duration=5400.0, dt=1.0, band=0.5):
+    """
+    Step the plant from its current temperature to setpoint under a
+    controller (anything called like PID: controller(temp, dt=, rate=)).
+
+    :return: (seconds until first within band, overshoot °C,
+              seconds until it stays within band; duration if it never does)
+    """
+    estimator = KettleEstimator(alpha=0.5, beta=0.1)
+    controller.setpoint = setpoint
+    power = 0.0
+    reached = None
+    settled = 0.0
+    peak = sim.water
+    while sim.time < duration:
+        reading = sim.step(power, dt)
+        temp = estimator.update(reading, dt, power)
+        power = controller(temp, dt=dt, rate=estimator.rate)
+        if reached is None and sim.water >= setpoint - band:
+            reached = sim.time
+        if not (-band <= sim.water - setpoint <= band):
+            settled = sim.time
+        peak = max(peak, sim.water)
+    return reached, max(0.0, peak - setpoint), settled
+
+
+def identify_plant(seed=0, power=100.0, duration=900.0, dt=1.0):
+    """Record a full-power heat-up on the simulator and fit an FOPDT model"""
+    sim = KettleSimulator(seed=seed)
+    temps = [sim.step(power, dt) for _ in range(int(duration / dt))]
+    return identify_step(temps, dt, power)
+
+
+def compare_smith(seeds=5, setpoint=66.0):
+    """
+    Step response of the default PID against a Smith predictor with more
+    aggressive gains, on the same simulated kettle.
+    """
+    gain, tau, dead_time = identify_plant()
+    print(f"Identified model: gain {gain:.2f} °C/%, tau {tau:.0f} s, "
+          f"dead time {dead_time:.0f} s")
+
+    def plain():
+        pid = PID(2.0, 0.1, 0.05)
+        pid.output_limits = (0, 100)
+        return pid
+
+    def smith():
+        pid = PID(SMITH_GAINS[0], SMITH_GAINS[1], SMITH_GAINS[2])
+        pid.output_limits = (0, 100)
+        return SmithPredictor(pid, gain, tau, dead_time)
+
+    for name, make in (("PID", plain), ("Smith", smith)):
+        reached, overshoot, settled = [], [], []
+        for seed in range(seeds):
+            r, o, t = run_step(KettleSimulator(seed=seed), make(), setpoint)
+            reached.append(r if r is not None else float('inf'))
+            overshoot.append(o)
+            settled.append(t)
+        print(f"  {name:<6} reaches setpoint {sum(reached) / seeds:6.0f} s"
+              f"  settles within 0.5 °C {sum(settled) / seeds:6.0f} s"
+              f"  overshoot {max(overshoot):5.2f} °C")
+
+
+# Gains for the Smith predictor mode, tuned on the undelayed model
+SMITH_GAINS = (100.0, 0.05, 0.0)
+
+
+def relay_tune(setpoint, seed=0, hysteresis=RELAY_HYSTERESIS, cycles=5, dt=1.0):
+    """
+    Relay auto-tune around a setpoint with the same switching and
+    gains.relay_tuning maths as BrewingModel.auto_tune_pid: heater full on
+    up to the setpoint, then off above setpoint + hysteresis and on below
+    setpoint - hysteresis for `cycles` full cycles.
+
+    :return: (kp, ki, kd)
+    """
+    sim = KettleSimulator(seed=seed)
+    estimator = KettleEstimator(alpha=0.5, beta=0.1)
+    power = 100.0
+    temp = sim.water
+    while temp < setpoint:
+        temp = estimator.update(sim.step(power, dt), dt, power)
+
+    power = 0.0
+    switches = [sim.time]
+    peaks = []
+    extreme = temp
+    while len(switches) < 2 * cycles + 1:
+        temp = estimator.update(sim.step(power, dt), dt, power)
+        extreme = max(extreme, temp) if power == 0.0 else min(extreme, temp)
+        if (power == 0.0 and temp <= setpoint - hysteresis) or \
+                (power > 0.0 and temp >= setpoint + hysteresis):
+            peaks.append(extreme)
+            switches.append(sim.time)
+            power = 100.0 - power
+            extreme = temp
+    return relay_tuning(switches, peaks)
+
+
+def brew_response(sim, gains, schedule=BREW_SCHEDULE, dt=1.0, band=0.5,
+                  max_time=8 * 3600.0):
+    """
+    Run a brew with a PID whose gains come from gains(setpoint), switched
+    bumplessly at each stage.
+
+    :return: [(seconds to reach setpoint, overshoot °C)] per stage
+    """
+    estimator = KettleEstimator(alpha=0.5, beta=0.1)
+    pid = PID(setpoint=schedule[0][0])
+    pid.output_limits = (0, 100)
+    pid.tunings = gains(schedule[0][0])
+    power = 0.0
+    results = []
+    for setpoint, hold in schedule:
+        pid.setpoint = setpoint
+        pid.set_tunings_bumpless(*gains(setpoint))
+        start = sim.time
+        target = min(setpoint, sim.boil)
+        reached = None
+        peak = sim.water
+        while sim.time < max_time:
+            temp = estimator.update(sim.step(power, dt), dt, power)
+            power = pid(temp, dt=dt, rate=estimator.rate)
+            if reached is None:
+                if sim.water >= target - band:
+                    reached = sim.time - start
+            else:
+                peak = max(peak, sim.water)
+                if sim.time - start - reached >= hold:
+                    break
+        results.append((reached, max(0.0, peak - target)))
+    return results
+
+
+def compare_schedule(seeds=5, tune_points=(50.0, 66.0, 76.0, 95.0)):
+    """
+    Whole-brew time to setpoint and overshoot per stage with the default
+    gains, one set of auto-tuned gains, and a gain schedule filled from
+    auto-tune runs at several setpoints.
+    """
+    schedule = GainSchedule()
+    for setpoint in tune_points:
+        kp, ki, kd = relay_tune(setpoint)
+        schedule.set_entry(setpoint, kp, ki, kd)
+        print(f"Tuned at {setpoint:5.1f} °C: Kp {kp:6.1f}  Ki {ki:5.3f}  Kd {kd:7.0f}")
+    single = schedule.gains(BREW_SCHEDULE[0][0])
+
+    configs = (
+        ("default", lambda sp: (2.0, 0.1, 0.05)),
+        ("single", lambda sp: single),
+        ("scheduled", schedule.gains),
+    )
+    print(f"{'gains':<10}" + "".join(f"  {sp:5.1f} °C reach / overshoot"
+                                      for sp, _ in BREW_SCHEDULE))
+    for name, gains in configs:
+        totals = [[0.0, 0.0] for _ in BREW_SCHEDULE]
+        for seed in range(seeds):
+            for stage, (reached, overshoot) in enumerate(
+                    brew_response(KettleSimulator(seed=seed), gains)):
+                totals[stage][0] += reached if reached is not None else float('inf')
+                totals[stage][1] = max(totals[stage][1], overshoot)
+        print(f"{name:<10}" + "".join(f"  {r / seeds:11.0f} s / {o:4.2f} °C"
+                                      for r, o in totals))
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "health"
+    if command == "health":
+        evaluate_health()
+    elif command == "smith":
+        compare_smith()
+    elif command == "schedule":
+        compare_schedule()
+    else:
+        print(f"Unknown command: {command}")
@@ -0,0 +1,146 @@
+# smith.py - Smith predictor (dead-time compensation) around the kettle PID
+
+from array import array
+import time
+
+
+class SmithPredictor:
+    """
+    Wraps a PID with an internal first-order-plus-dead-time (FOPDT) model of
+    the kettle.  The PID is fed the measurement corrected by the difference
+    between the undelayed and delayed model outputs, so it can be tuned for
+    the plant without its transport lag.
+
+    The dead time is held in a fixed-size ring buffer of model outputs, one
+    slot per control sample.
+    """
+
+    def __init__(self, pid, gain, time_constant, dead_time, sample_time=1.0,
+                 max_samples=600):
+        """
+        :param pid: PID controller to drive
+        :param gain: Steady-state rise per % heater power (°C/%)
+        :param time_constant: Model time constant (s)
+        :param dead_time: Model dead time (s)
+        :param sample_time: Nominal control period (s); sets the delay length
+        :param max_samples: Ring buffer size, limits the longest dead time
+        """
+        self.pid = pid
+        self.sample_time = sample_time
+        self._delay = array('f', [0.0] * max_samples)
+        self.configure(gain, time_constant, dead_time)
+
+    def configure(self, gain, time_constant, dead_time):
+        """Set the model parameters and clear the model state"""
+        samples = int(dead_time / self.sample_time + 0.5)
+        if samples > len(self._delay):
+            raise ValueError(f"Dead time {dead_time}s exceeds the delay buffer")
+        self.gain = gain
+        self.time_constant = time_constant
+        self.dead_time = dead_time
+        self._samples = samples
+        self.reset()
+
+    def reset(self):
+        """Clear the model and the wrapped PID"""
+        for i in range(len(self._delay)):
+            self._delay[i] = 0.0
+        self._index = 0
+        self._model = 0.0        # undelayed model output (deviation, °C)
+        self._model_prev = 0.0
+        self._delayed_prev = 0.0
+        self._last_output = 0.0
+        self._last_time = None
+        self.pid.reset()
+
+    @property
+    def setpoint(self):
+        return self.pid.setpoint
+
+    @setpoint.setter
+    def setpoint(self, value):
+        self.pid.setpoint = value
+
+    def __call__(self, input_val, dt=None, rate=None):
+        """
+        Calculate the heater output.
+
+        :param input_val: Measured (or filtered) temperature
+        :param dt: Time delta in seconds (optional, will calculate if None)
+        :param rate: Measured rate of change (optional), corrected by the
+                     model in the same way as the temperature
+        :return: PID output
+        """
+        now = time.ticks_ms()
+        if dt is None:
+            if self._last_time is None:
+                dt = self.sample_time
+            else:
+                dt = time.ticks_diff(now, self._last_time) / 1000.0
+        if dt <= 0.0:
+            dt = self.sample_time
+        self._last_time = now
+
+        # Advance the model with the output applied over the last interval
+        self._model_prev = self._model
+        self._model += dt * (self.gain * self._last_output - self._model) / self.time_constant
+
+        if self._samples:
+            delayed = self._delay[self._index]
+            self._delay[self._index] = self._model
+            self._index += 1
+            if self._index >= self._samples:
+                self._index = 0
+        else:
+            delayed = self._model
+
+        feedback = input_val + self._model - delayed
+        if rate is not None:
+            rate += (self._model - self._model_prev - delayed + self._delayed_prev) / dt
+        self._delayed_prev = delayed
+
+        self._last_output = self.pid(feedback, dt=dt, rate=rate)
+        return self._last_output
+
+
+def identify_step(temps, sample_time, power, time_constant=20000.0):
+    """
+    Estimate FOPDT parameters from a heat-up log recorded with the heater at
+    a fixed power from rest.  A kettle behaves almost as an integrator over a
+    heat-up, so the time constant is supplied; the gain comes from the slope
+    of the ramp and the dead time from where that ramp meets the starting
+    temperature.
+
+    :param temps: Temperatures sampled every sample_time seconds
+    :param sample_time: Sample period (s)
+    :param power: Heater power during the log (%)
+    :param time_constant: Assumed model time constant (s)
+    :return: (gain, time_constant, dead_time)
+    """
+    n = len(temps)
+    if n < 20:
+        raise ValueError("Heat-up log too short to identify")
+
+    # Least-squares line through the second half of the log, where the
+    # element and probe lags have settled into a steady ramp
+    first = n // 2
+    count = n - first
+    mean_t = (first + n - 1) / 2.0
+    mean_y = sum(temps[first:]) / count
+    num = 0.0
+    den = 0.0
+    for i in range(first, n):
+        dt = i - mean_t
+        num += dt * (temps[i] - mean_y)
+        den += dt * dt
+    slope = num / den / sample_time
+    if slope <= 0.0:
+        raise ValueError("No temperature rise in heat-up log")
+
+    window = max(1, n // 20)
+    start = sum(temps[:window]) / window
+    dead_time = mean_t * sample_time - (mean_y - start) / slope
+    if dead_time < 0.0:
+        dead_time = 0.0
+    gain = slope * time_constant / power
+    return gain, time_constant, dead_time
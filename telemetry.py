@@ -0,0 +1,99 @@
+# telemetry.py - Compact UDP telemetry datagrams for fleet monitoring
+#
+# Packet layout (little-endian):
+#   header  <2sBBH   magic b'BT', version, record count, controller id
+#   record  <IIffffffH  seq, timestamp ms, temp, setpoint, duty,
+#                       P term, I term, D term, flags
+# The host-side collector in host/collector.py decodes the same layout.
+
+import socket
+import struct
+import time
+
+MAGIC = b'BT'
+VERSION = 1
+HEADER_FORMAT = '<2sBBH'
+RECORD_FORMAT = '<IIffffffH'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+DEFAULT_PORT = 4210
+
+FLAG_HEATER_ENABLED = 0x01
+FLAG_HEATING_ON = 0x02
+FLAG_PUMP_ON = 0x04
+FLAG_FAULT = 0x08
+
+
+class TelemetrySender:
+    """
+    Packs one record per control tick into a preallocated datagram buffer and
+    sends it over UDP once `batch` records have been collected.
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT, controller_id=0, batch=1,
+                 multicast_ttl=1):
+        """
+        :param host: Collector address, unicast or multicast (224.0.0.0/4)
+        :param port: Collector UDP port
+        :param controller_id: Identifies this kettle to the collector
+        :param batch: Number of ticks packed into each datagram
+        :param multicast_ttl: TTL used when host is a multicast group
+        """
+        self.addr = socket.getaddrinfo(host, port)[0][-1]
+        self.controller_id = controller_id
+        self.batch = batch
+        self.seq = 0
+        self.sent = 0
+        self.errors = 0
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        first = host.split('.')[0]
+        if first.isdigit() and 224 <= int(first) <= 239:
+            try:
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL,
+                                     multicast_ttl)
+            except (AttributeError, OSError):
+                pass
+
+        self._buf = bytearray(HEADER_SIZE + batch * RECORD_SIZE)
+        self._count = 0
+
+    def record(self, model, now=None):
+        """Pack the model's current state; sends when the batch is full"""
+        if now is None:
+            now = time.ticks_ms()
+        flags = 0
+        if model.heater_enabled:
+            flags |= FLAG_HEATER_ENABLED
+        if model.heating_on:
+            flags |= FLAG_HEATING_ON
+        if model.pump_on:
+            flags |= FLAG_PUMP_ON
+        if model.fault:
+            flags |= FLAG_FAULT
+
+        pid = model.active_pid
+        struct.pack_into(RECORD_FORMAT, self._buf,
+                         HEADER_SIZE + self._count * RECORD_SIZE,
+                         self.seq & 0xFFFFFFFF, now & 0xFFFFFFFF,
+                         model.temperature, model.setpoint, model.heater_power,
+                         pid.p_term, pid.i_term, pid.d_term, flags)
+        self.seq += 1
+        self._count += 1
+        if self._count >= self.batch:
+            self.flush()
+
+    def flush(self):
+        """Send any records collected so far"""
+        if not self._count:
+            return
+        struct.pack_into(HEADER_FORMAT, self._buf, 0, MAGIC, VERSION,
+                         self._count, self.controller_id)
+        size = HEADER_SIZE + self._count * RECORD_SIZE
+        self._count = 0
+        try:
+            self.sock.sendto(memoryview(self._buf)[:size], self.addr)
+            self.sent += 1
+        except OSError:
+            # Telemetry must never stall the control loop
+            self.errors += 1
@@ -3,6 +3,7 @@
 import machine
 import time
 import lvgl as lv
+from logger import log
 
 # --- I2C Setup (adjust pins as needed) ---
 i2c = machine.I2C(1, scl=machine.Pin(22), sda=machine.Pin(21), freq=400000)
@@ -11,11 +12,24 @@ GT911_ADDR = 0x5D  # Default I2C address
 TOUCH_STATUS_REG = 0x814E
 TOUCH_DATA_REG = 0x8150
 
+# After this many failed reads in a row, only retry every RETRY_READS reads
+# so a missing or wedged controller doesn't raise an exception every poll
+MAX_ERRORS = 3
+RETRY_READS = 100
+
+_CLEAR = b'\x00'
+
 class GT911TouchDriver:
     def __init__(self):
         self.last_x = 0
         self.last_y = 0
         self.pressed = False
+        self.errors = 0
+        self._skip = 0
+
+        # Read into the same buffers on every poll
+        self._status = bytearray(1)
+        self._coords = bytearray(4)
         
         # Create LVGL input device
         self.indev = lv.indev_drv_t()
@@ -28,14 +42,21 @@ class GT911TouchDriver:
 
     def _read_touch(self, indev_drv, data):
         """LVGL touch read callback"""
+        if self._skip:
+            self._skip -= 1
+            data.point.x = self.last_x
+            data.point.y = self.last_y
+            data.state = lv.INDEV_STATE.RELEASED
+            return False
         try:
             # Read touch status
-            status = i2c.readfrom_mem(GT911_ADDR, TOUCH_STATUS_REG, 1)[0]
-            touch_detected = bool(status & 0x01)
+            i2c.readfrom_mem_into(GT911_ADDR, TOUCH_STATUS_REG, self._status)
+            touch_detected = bool(self._status[0] & 0x01)
             
             if touch_detected:
                 # Read coordinates
-                coord_data = i2c.readfrom_mem(GT911_ADDR, TOUCH_DATA_REG, 4)
+                coord_data = self._coords
+                i2c.readfrom_mem_into(GT911_ADDR, TOUCH_DATA_REG, coord_data)
                 x = coord_data[1] << 8 | coord_data[0]
                 y = coord_data[3] << 8 | coord_data[2]
                 
@@ -54,7 +75,7 @@ class GT911TouchDriver:
                 data.state = lv.INDEV_STATE.PRESSED
                 
                 # Clear touch status register
-                i2c.writeto_mem(GT911_ADDR, TOUCH_STATUS_REG, bytes([0]))
+                i2c.writeto_mem(GT911_ADDR, TOUCH_STATUS_REG, _CLEAR)
                 
             else:
                 # No touch detected
@@ -62,9 +83,13 @@ class GT911TouchDriver:
                 data.point.y = self.last_y
                 data.state = lv.INDEV_STATE.RELEASED
                 self.pressed = False
+            self.errors = 0
                 
         except Exception as e:
-            print(f"⚠️ Touch read error: {e}")
+            log.warning("⚠️ Touch read error: %s", e)
+            self.errors += 1
+            if self.errors >= MAX_ERRORS:
+                self._skip = RETRY_READS
             # Return released state on error
             data.point.x = self.last_x
             data.point.y = self.last_y
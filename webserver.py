@@ -1,6 +1,398 @@
 import socket
+import struct
+import time
+import hashlib
+import binascii
+import ujson
+import machine
+import _thread
+import ota
+import history
+from logger import log
+
+WWW_DIR = 'www/'
+CHUNK_SIZE = 1024
+
+# (file name, content type) for each static asset, keyed by URL path
+STATIC_FILES = {
+    '/': ('index.html', b'text/html'),
+    '/index.html': ('index.html', b'text/html'),
+    '/style.css': ('style.css', b'text/css'),
+    '/app.js': ('app.js', b'application/javascript'),
+}
+
+# Reused for every streamed response so serving a page allocates no buffers
+_buf = bytearray(CHUNK_SIZE)
+_buf_mv = memoryview(_buf)
+
+# Per-request figures for checking the cost of the server
+stats = {'requests': 0, 'bytes_sent': 0, 'last_request_us': 0}
+
+
+def _file_etag(path):
+    """Hash a file in CHUNK_SIZE pieces and return a quoted ETag"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            n = f.readinto(_buf)
+            if not n:
+                break
+            h.update(_buf_mv[:n])
+    return b'"' + binascii.hexlify(h.digest()[:8]) + b'"'
+
+
+def load_assets():
+    """
+    Locate each static asset on flash, preferring the pre-compressed .gz
+    built by build_web.py, and compute its ETag once.  The plain file behind
+    a .gz gets its own ETag, for clients that don't accept gzip.
+    """
+    assets = {}
+    for url, (name, ctype) in STATIC_FILES.items():
+        for path, gz in ((WWW_DIR + name + '.gz', True), (WWW_DIR + name, False)):
+            try:
+                etag = _file_etag(path)
+            except OSError:
+                continue
+            plain_etag = None
+            if gz:
+                try:
+                    plain_etag = _file_etag(path[:-3])
+                except OSError:
+                    pass
+            assets[url] = (path, ctype, gz, etag, plain_etag)
+            break
+        else:
+            log.warning('⚠️ Missing web asset: %s', name)
+    return assets
+
+
+def _read_request(cl):
+    """
+    Read the request line and headers.
+
+    :return: (method, path, query, headers, body bytes already received)
+    """
+    data = b''
+    while b'\r\n\r\n' not in data and len(data) < 2048:
+        chunk = cl.recv(512)
+        if not chunk:
+            break
+        data += chunk
+    head, _, body = data.partition(b'\r\n\r\n')
+    lines = head.decode().split('\r\n')
+    parts = lines[0].split(' ')
+    if len(parts) < 2:
+        return None, None, '', {}, b''
+    path, _, query = parts[1].partition('?')
+    headers = {}
+    for line in lines[1:]:
+        key, _, val = line.partition(':')
+        headers[key.strip().lower()] = val.strip()
+    return parts[0], path, query, headers, body
+
+
+def _unquote(text):
+    """Decode %XX escapes in a query value"""
+    if '%' not in text:
+        return text
+    parts = text.split('%')
+    out = parts[0]
+    for part in parts[1:]:
+        out += chr(int(part[:2], 16)) + part[2:]
+    return out
+
+
+def _read_body(cl, headers, body, limit=4096):
+    """Read a small request body completely (not used for file uploads)"""
+    length = int(headers.get('content-length', 0))
+    if length > limit:
+        raise ValueError('Request body too large')
+    while len(body) < length:
+        chunk = cl.recv(512)
+        if not chunk:
+            break
+        body += chunk
+    return body[:length]
+
+
+def apply_params(model, query):
+    """Apply control changes from a query string"""
+    kp = ki = kd = None
+    try:
+        for param in query.split('&'):
+            if '=' not in param:
+                continue
+            key, val = param.split('=', 1)
+            if key == 'p': kp = float(val)
+            if key == 'i': ki = float(val)
+            if key == 'd': kd = float(val)
+            if key == 'schedule' and val == 'clear': model.clear_gain_schedule()
+            if key == 'smith':
+                # smith=gain,time_constant,dead_time (see simulator.py smith)
+                gain, tau, dead_time = val.split('%2C' if '%2C' in val else ',')
+                model.configure_smith(float(gain), float(tau), float(dead_time))
+            if key == 'control': model.set_control_mode(val)
+            if key == 'pump': model.toggle_pump()
+            if key == 'heater': model.toggle_heater_enabled()  # 👈 Updated call
+            if key == 'mode': model.heater.set_mode(val)
+            if key == 'autotune':
+                # Runs for many minutes; BrewingModel refuses a second run
+                _thread.start_new_thread(model.auto_tune_pid, ())
+        if kp is not None or ki is not None or kd is not None:
+            model.set_pid_gains(kp, ki, kd)
+    except Exception as e:
+        log.warning('⚠️ Bad request parameters: %s', e)
+
+
+# Reused by status_json so a status poll doesn't build a new dict
+_status = {}
+
+
+def status_json(model):
+    """Live values for the web UI"""
+    eta = model.time_to_setpoint()
+    pid = model.active_pid
+    status = _status
+    status['temp'] = model.temperature
+    status['setpoint'] = model.setpoint
+    status['heater'] = model.heater_power
+    status['heater_enabled'] = model.heater_enabled
+    status['pump'] = model.pump_on
+    status['stage'] = model.stage
+    status['eta'] = None if eta is None else int(eta)
+    status['kp'] = pid.kp
+    status['ki'] = pid.ki
+    status['kd'] = pid.kd
+    status['control'] = model.control_mode
+    status['mode'] = model.heater.mode
+    status['switches'] = model.heater.switches_per_minute
+    status['fault'] = model.fault
+    return ujson.dumps(status)
+
+
+def _send(cl, data):
+    cl.sendall(data)
+    stats['bytes_sent'] += len(data)
+
+
+def _etag_matches(header, etag):
+    """If-None-Match check: a comma-separated list of (weak or strong) ETags, or *"""
+    if not header:
+        return False
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag.encode() == etag:
+            return True
+    return False
+
+
+def _send_asset(cl, asset, headers):
+    path, ctype, gz, etag, plain_etag = asset
+    vary = b''
+    if gz:
+        # The representation depends on Accept-Encoding; caches must know
+        vary = b'\r\nVary: Accept-Encoding'
+        if plain_etag and 'gzip' not in headers.get('accept-encoding', ''):
+            # Rare client without gzip support: the plain file, own ETag
+            path = path[:-3]
+            gz = False
+            etag = plain_etag
+    if _etag_matches(headers.get('if-none-match'), etag):
+        _send(cl, b'HTTP/1.0 304 Not Modified\r\nETag: ' + etag + vary + b'\r\n\r\n')
+        return
+    f = open(path, 'rb')
+    _send(cl, b'HTTP/1.0 200 OK\r\nContent-Type: ' + ctype +
+          (b'\r\nContent-Encoding: gzip' if gz else b'') + vary +
+          b'\r\nCache-Control: no-cache\r\nETag: ' + etag + b'\r\n\r\n')
+    with f:
+        while True:
+            n = f.readinto(_buf)
+            if not n:
+                break
+            _send(cl, _buf_mv[:n])
+
+
+def _send_json(cl, status, data):
+    _send(cl, b'HTTP/1.0 ' + status + b'\r\nContent-Type: application/json\r\n\r\n')
+    _send(cl, ujson.dumps(data).encode())
+
+
+def handle_history(cl, buffer, query):
+    """
+    Downsampled history: /api/history?from=-7200&to=&points=200&format=json
+
+    from/to are device times in seconds, or relative to now when negative.
+    The default response is the little-endian columnar layout described in
+    history.py; format=json gives the same columns as JSON arrays.
+    """
+    t_from = t_to = None
+    points = 200
+    fmt = 'bin'
+    try:
+        for param in query.split('&'):
+            if '=' not in param:
+                continue
+            key, val = param.split('=', 1)
+            if not val:
+                continue
+            if key == 'from': t_from = int(val)
+            if key == 'to': t_to = int(val)
+            if key == 'points': points = int(val)
+            if key == 'format': fmt = val
+    except ValueError:
+        _send(cl, b'HTTP/1.0 400 Bad Request\r\n\r\n')
+        return
+
+    data = buffer.query(t_from, t_to, points)
+    if fmt != 'json':
+        _send(cl, b'HTTP/1.0 200 OK\r\nContent-Type: application/octet-stream\r\n'
+                  b'Cache-Control: no-store\r\nContent-Length: ' +
+              str(len(data)).encode() + b'\r\n\r\n')
+        _send(cl, data)
+        return
+
+    _, _, ncols, n, now, start, step = struct.unpack_from(history.HEADER_FORMAT, data, 0)
+    _send(cl, b'HTTP/1.0 200 OK\r\nContent-Type: application/json\r\n'
+              b'Cache-Control: no-store\r\n\r\n')
+    _send(cl, ('{"now": %d, "from": %d, "step": %g' % (now, start, step)).encode())
+    offset = history.HEADER_SIZE
+    for c in range(ncols):
+        # Format values straight from the response buffer, a block at a time
+        text = ', "%s": [' % history.COLUMNS[c]
+        for i in range(n):
+            v = struct.unpack_from('<f', data, offset)[0]
+            offset += 4
+            text += ('null' if v != v else '%.2f' % v) + (', ' if i < n - 1 else '')
+            if len(text) > 200:
+                _send(cl, text.encode())
+                text = ''
+        _send(cl, (text + ']').encode())
+    _send(cl, b'}')
+
+
+def _token_ok(headers, token):
+    """Check an "Authorization: Bearer <token>" header against the shared token"""
+    if not token:
+        return False
+    given = headers.get('authorization', '')
+    if not given.startswith('Bearer '):
+        return False
+    given = given[7:].strip()
+    # Compare every character so the time taken doesn't leak the token
+    diff = len(given) ^ len(token)
+    for i in range(len(given)):
+        diff |= ord(given[i]) ^ ord(token[i % len(token)])
+    return diff == 0
+
+
+def handle_ota(cl, method, path, query, headers, body, token=None):
+    """
+    Over-the-air update endpoints:
+      POST /api/ota/begin            body: manifest JSON
+      PUT  /api/ota/file?path=<p>    body: file contents, streamed to flash
+      POST /api/ota/commit           verify, then reboot into the update
+
+    Every request needs "Authorization: Bearer <token>"; without a token
+    configured, updates are refused.
+    """
+    if method not in ('POST', 'PUT'):
+        _send(cl, b'HTTP/1.0 405 Method Not Allowed\r\n\r\n')
+        return
+    if not _token_ok(headers, token):
+        log.warning('⚠️ OTA request without a valid token refused')
+        _send_json(cl, b'401 Unauthorized', {'error': 'OTA token required'})
+        return
+    try:
+        if path == '/api/ota/begin':
+            ota.begin(ujson.loads(_read_body(cl, headers, body)))
+            _send_json(cl, b'200 OK', {'ok': True})
+        elif path == '/api/ota/file':
+            name = ''
+            for param in query.split('&'):
+                if param.startswith('path='):
+                    name = _unquote(param[5:])
+            length = int(headers.get('content-length', 0))
+            received, elapsed = ota.receive_file(name, cl, length, body)
+            _send_json(cl, b'200 OK', {
+                'path': name,
+                'bytes': received,
+                'ms': elapsed,
+                'kbps': received / 1.024 / max(elapsed, 1),
+            })
+        elif path == '/api/ota/commit':
+            ota.commit()
+            _send_json(cl, b'200 OK', {'ok': True, 'rebooting': True})
+            cl.close()
+            time.sleep_ms(200)
+            machine.reset()
+        else:
+            _send(cl, b'HTTP/1.0 404 Not Found\r\n\r\n')
+    except ValueError as e:
+        log.warning('⚠️ OTA request failed: %s', e)
+        _send_json(cl, b'400 Bad Request', {'error': str(e)})
+
+
+def handle_request(model, assets, cl, ota_token=None):
+    """Serve one connection"""
+    method, path, query, headers, body = _read_request(cl)
+    if path is None:
+        return
+
+    if path == '/api/status':
+        _send(cl, b'HTTP/1.0 200 OK\r\nContent-Type: application/json\r\n'
+                  b'Cache-Control: no-store\r\n\r\n')
+        _send(cl, status_json(model).encode())
+        return
+
+    # Log tail: /api/log?n=50
+    if path == '/api/log':
+        n = 50
+        if query.startswith('n='):
+            try:
+                n = int(query[2:])
+            except ValueError:
+                pass
+        _send(cl, b'HTTP/1.0 200 OK\r\nContent-Type: text/plain\r\n\r\n')
+        for line in log.tail(n):
+            _send(cl, line.encode())
+            _send(cl, b'\n')
+        return
+
+    if path == '/api/history':
+        handle_history(cl, model.history, query)
+        return
+
+    if path.startswith('/api/ota/'):
+        handle_ota(cl, method, path, query, headers, body, ota_token)
+        return
+
+    if path == '/api/set':
+        apply_params(model, query)
+        _send(cl, b'HTTP/1.0 204 No Content\r\n\r\n')
+        return
+
+    asset = assets.get(path)
+    if asset is None:
+        _send(cl, b'HTTP/1.0 404 Not Found\r\n\r\n')
+        return
+
+    # Plain form submissions to /? still work without JavaScript
+    if query:
+        apply_params(model, query)
+    _send_asset(cl, asset, headers)
+
+
+def start_web_server(model, ota_token=None):
+    """
+    :param ota_token: Shared secret required by /api/ota/*; None disables OTA
+    """
+    assets = load_assets()
 
-def start_web_server(model):
     addr = socket.getaddrinfo('0.0.0.0', 80)[0][-1]
     s = socket.socket()
     s.bind(addr)
@@ -9,58 +401,12 @@ def start_web_server(model):
 
     while True:
         cl, addr = s.accept()
-        request = cl.recv(1024).decode()
-
-        # Parse GET parameters
-        if 'GET /?' in request:
-            try:
-                params = request.split(' ')[1].split('?')[1].split('&')
-                for param in params:
-                    key, val = param.split('=')
-                    if key == 'p': model.pid.kp = float(val)
-                    if key == 'i': model.pid.ki = float(val)
-                    if key == 'd': model.pid.kd = float(val)
-                    if key == 'pump': model.toggle_pump()
-                    if key == 'heater': model.toggle_heater_enabled()  # 👈 Updated call
-                    if key == 'autotune':
-                        model.auto_tune_pid()
-            except:
-                pass
-
-        # Build HTML response
-        html = f"""<!DOCTYPE html>
-        <html>
-        <head>
-            <title>Brewing PID Control</title>
-            <style>
-                body {{ font-family: Arial; background: #f4f4f4; padding: 20px; }}
-                h2 {{ color: #333; }}
-                .status {{ margin-top: 10px; font-weight: bold; }}
-                button {{ padding: 10px 20px; margin: 5px; }}
-            </style>
-        </head>
-        <body>
-            <h2>Current Temperature: {model.temperature:.2f}°C</h2>
-            <div class="status">
-                Heater Enabled: {'YES' if model.heater_enabled else 'NO'}<br>
-                Pump: {'ON' if model.pump_on else 'OFF'}
-            </div>
-            <form>
-                <h3>PID Settings</h3>
-                P: <input name="p" value="{model.pid.kp}"><br>
-                I: <input name="i" value="{model.pid.ki}"><br>
-                D: <input name="d" value="{model.pid.kd}"><br>
-                <input type="submit" value="Update PID">
-            </form>
-            <form>
-                <h3>Actuator Control</h3>
-                <button name="pump" value="toggle">Toggle Pump</button>
-                <button name="heater" value="toggle">Toggle Heater Enabled</button>
-                <button name="autotune" value="run">Auto-Tune PID</button>
-            </form>
-        </body>
-        </html>"""
-
-        cl.send('HTTP/1.0 200 OK\r\nContent-type: text/html\r\n\r\n')
-        cl.send(html)
-        cl.close()
+        start = time.ticks_us()
+        try:
+            handle_request(model, assets, cl, ota_token)
+        except Exception as e:
+            log.warning('⚠️ Web request failed: %s', e)
+        finally:
+            cl.close()
+        stats['requests'] += 1
+        stats['last_request_us'] = time.ticks_diff(time.ticks_us(), start)
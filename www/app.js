@@ -0,0 +1,44 @@
+// app.js - Live values for the static control page, polled from /api/status
+
+function $(id) { return document.getElementById(id); }
+
+function render(s) {
+    $('temp').textContent = s.temp.toFixed(2);
+    $('setpoint').textContent = s.setpoint.toFixed(1);
+    $('heater_enabled').textContent = s.heater_enabled ? 'YES' : 'NO';
+    $('heater').textContent = s.heater.toFixed(1);
+    $('pump').textContent = s.pump ? 'ON' : 'OFF';
+    $('stage').textContent = s.stage;
+    $('eta').textContent = s.eta === null ? '--:--' :
+        String(Math.floor(s.eta / 60)).padStart(2, '0') + ':' +
+        String(Math.floor(s.eta % 60)).padStart(2, '0');
+    $('mode').textContent = s.mode;
+    $('switches').textContent = s.switches;
+    $('control').textContent = s.control;
+    $('fault').textContent = s.fault || '';
+    for (const k of ['kp', 'ki', 'kd']) {
+        if (document.activeElement !== $(k)) $(k).value = s[k];
+    }
+}
+
+function refresh() {
+    fetch('/api/status').then(r => r.json()).then(render).catch(() => {});
+}
+
+function send(query) {
+    fetch('/api/set?' + query).then(refresh);
+}
+
+for (const form of document.forms) {
+    form.addEventListener('submit', e => {
+        e.preventDefault();
+        if (form.id === 'pid') {
+            send(new URLSearchParams(new FormData(form)).toString());
+        } else if (e.submitter) {
+            send(e.submitter.name + '=' + e.submitter.value);
+        }
+    });
+}
+
+refresh();
+setInterval(refresh, 2000);